@@ -0,0 +1,308 @@
+# batch.py
+# --------
+# Solves many eight puzzles in one process.
+
+
+"""
+Instances are read one at a time from a JSON-lines or CSV file (or stdin),
+and each result is written as one JSON line as soon as it is found, so
+memory does not grow with the size of the batch.  Heuristic tables are
+cached per goal by search.py, patterndb.py and distancetable.py, so they are
+built or mapped once and then shared by every instance with the same goal;
+the pattern databases and distance tables of the least recently used goals
+are unmapped once more than a few are open.  With normalize set at most
+three goals are ever seen.
+
+A JSON-lines instance is an object such as
+
+    {"id": "p1", "initial": "[[-,2,3],[1,4,5],[8,7,6]]", "goal": "[[1,2,3],[8,-,4],[7,6,5]]"}
+
+where 'initial' and 'goal' may also be nested or flat lists of numbers, with
+0 or '-' for the blank.  A CSV file has a header row naming an 'initial'
+column and optionally 'id' and 'goal' columns.  Instances without a goal
+use the one given to solveBatch.  Instances without an id are numbered
+from 1 in input order.
+
+Each result line holds the instance's id, whether it was solved, the path,
+its cost, the nodes expanded, the search depth and the time taken, or an
+'error' message if the instance could not be read, failed or timed out.
+
+solveParallel spreads a batch over a pool of worker processes.  The tables
+for the batch's goal are built once in the parent and saved, and each
+worker maps them when it starts, so the pages are shared between workers
+and nothing but the instances is sent per task.
+"""
+
+import collections
+import concurrent.futures
+import csv
+import itertools
+import json
+import multiprocessing
+from concurrent.futures.process import BrokenProcessPool
+
+import eightpuzzle
+import util
+
+FORMATS = ('jsonl', 'csv')
+
+def parseState(value):
+    "Returns the EightPuzzleState for a grid string or a nested or flat list."
+    if isinstance(value, str):
+        numbers = eightpuzzle.parse_grid(value)
+    else:
+        numbers = []
+        for item in value:
+            numbers.extend(item if isinstance(item, list) else [item])
+        numbers = [0 if number == '-' else int(number) for number in numbers]
+    if sorted(numbers) != list(range(9)):
+        raise ValueError("Not an eight puzzle: %s" % (value,))
+    return eightpuzzle.EightPuzzleState(numbers)
+
+def readInstances(stream, format='jsonl'):
+    """
+    Yields one dict per instance in 'stream'.  A line that is not valid
+    JSON yields {'error': message} so that it fails on its own.
+    """
+    if format not in FORMATS:
+        raise ValueError("Unknown batch format '%s'; choose from %s" % (format, ', '.join(FORMATS)))
+    if format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as error:
+            yield {'error': 'Bad JSON line: %s' % error}
+
+def _instanceId(number, instance):
+    "Returns the instance's id, or its number in the batch if it has none."
+    instanceId = instance.get('id', '')
+    return number if instanceId == '' else instanceId
+
+def solveInstance(number, instance, searchName, heuristicName=None, goal=None,
+                  tileCosts=None, normalize=False, options=None, timeout=None, cache=None):
+    """
+    Solves one instance and returns its result dict.  'options' holds the
+    keyword arguments of eightpuzzle.search_options, 'timeout' is a limit
+    in whole seconds and 'cache' an optional solutioncache.SolutionCache.
+    Errors and timeouts are reported in the result instead of being raised.
+    """
+    result = {'id': _instanceId(number, instance)}
+    try:
+        if 'error' in instance:
+            raise ValueError(instance['error'])
+        initial = parseState(instance['initial'])
+        if instance.get('goal'):
+            goal = parseState(instance['goal'])
+        problem = eightpuzzle.EightPuzzleSearchProblem(initial, goal, tileCosts)
+
+        searchFunction, usesHeuristic, takesOptions = eightpuzzle.SEARCHES[searchName]
+        heuristic = eightpuzzle.HEURISTICS[heuristicName] if usesHeuristic else None
+        searchOptions = eightpuzzle.search_options(**(options or {})) if takesOptions else None
+        runSearch = eightpuzzle.run_search
+        if timeout:
+            runSearch = util.TimeoutFunction(runSearch, timeout)
+        metrics = runSearch(problem, searchFunction, searchName, initial, heuristic,
+                            normalize, stats={}, options=searchOptions, verbose=False, cache=cache)
+    except util.TimeoutFunctionException:
+        result['error'] = 'Timed out after %d seconds' % timeout
+        return result
+    except Exception as error:
+        result['error'] = '%s: %s' % (type(error).__name__, error)
+        return result
+
+    result['solved'] = bool(metrics['path']) or problem.isGoalState(initial)
+    result['path'] = metrics['path']
+    result['cost'] = metrics['path_cost']
+    result['nodes_expanded'] = metrics['nodes_expanded']
+    result['depth'] = metrics['max_depth']
+    result['time'] = round(metrics['time'], 6)
+    if metrics['stats']:
+        result['stats'] = metrics['stats']
+    if metrics['cached']:
+        result['cached'] = True
+    return result
+
+def solveBatch(instances, out, searchName, heuristicName=None, goal=None,
+               tileCosts=None, normalize=False, options=None, timeout=None, cache=None):
+    """
+    Solves each instance in turn and writes its result to 'out' as one JSON
+    line, flushing after every line.  Returns the number of instances.
+    """
+    count = 0
+    for count, instance in enumerate(instances, 1):
+        result = solveInstance(count, instance, searchName, heuristicName, goal,
+                               tileCosts, normalize, options, timeout, cache)
+        out.write(json.dumps(result) + '\n')
+        out.flush()
+    return count
+
+def warmUp(searchName, heuristicName=None, goal=None, normalize=False):
+    """
+    Loads the tables a batch will need (see eightpuzzle.loadTables): any
+    that is missing is built and saved under util.TABLE_DIR, or published
+    in shared memory if it cannot be saved.
+    """
+    eightpuzzle.loadTables(searchName, heuristicName, goal, normalize)
+
+# The batch settings of a worker process, and the queue on which it says
+# which chunk it is starting, set once by _initWorker
+_workerSettings = None
+_startQueue = None
+
+def _initWorker(settings, startQueue=None):
+    global _workerSettings, _startQueue
+    _workerSettings = settings
+    _startQueue = startQueue
+    warmUp(settings['searchName'], settings['heuristicName'], settings['goal'],
+           settings['normalize'])
+
+def _solveChunk(tasks):
+    if _startQueue is not None:
+        _startQueue.put(tasks[0][0])
+    return [solveInstance(number, instance, **_workerSettings) for number, instance in tasks]
+
+class _WorkerPool:
+    """
+      A ProcessPoolExecutor that is replaced by a new one after a worker
+    dies.  Chunks are known by the number of their first instance, and
+    startedChunks() tells which ones the workers of the current pool began.
+    """
+    def __init__(self, workers, settings):
+        self.workers = workers
+        self.settings = settings
+        self.executor = None
+        self.restart()
+
+    def restart(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        self.startQueue = multiprocessing.SimpleQueue()
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            self.workers, initializer=_initWorker, initargs=(self.settings, self.startQueue))
+
+    def submit(self, chunk):
+        return self.executor.submit(_solveChunk, chunk)
+
+    def startedChunks(self):
+        started = set()
+        while not self.startQueue.empty():
+            started.add(self.startQueue.get())
+        return started
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+def _solveAlone(pool, chunk):
+    """
+    Solves the instances of 'chunk' one at a time with nothing else in
+    flight, so that a worker dying can only be blamed on the instance it
+    was given.  Returns their results.
+    """
+    results = []
+    for task in chunk:
+        try:
+            results.extend(pool.submit([task]).result())
+        except BrokenProcessPool:
+            pool.restart()
+            results.append({'id': _instanceId(*task),
+                            'error': 'The worker process died while solving this instance'})
+    return results
+
+def _recover(pool, pending):
+    """
+    Handles a worker dying.  Each chunk of the broken pool that had not
+    finished is sent again if no worker had started it, or re-solved one
+    instance at a time on the new pool if it was being solved.  Chunks
+    that did finish keep their results.
+    """
+    concurrent.futures.wait([future for _, future in pending if future is not None])
+    started = pool.startedChunks()
+    if not started:
+        # No worker got as far as a chunk, so a new pool would die the same way
+        raise BrokenProcessPool("The worker processes died before solving any instance")
+    pool.restart()
+    for entry in pending:
+        chunk, future = entry
+        if future is None or not isinstance(future.exception(), BrokenProcessPool):
+            continue
+        entry[1] = None  # sent again by solveParallel
+        if chunk[0][0] in started:
+            entry[1] = concurrent.futures.Future()
+            entry[1].set_result(_solveAlone(pool, chunk))
+
+def solveParallel(instances, out, searchName, heuristicName=None, goal=None,
+                  tileCosts=None, normalize=False, options=None, timeout=None,
+                  workers=None, chunksize=1, ordered=True, cache=None):
+    """
+    Solves the instances on 'workers' processes (default: one per CPU) and
+    writes each result to 'out' as one JSON line, flushing after every
+    line.  Instances are read and sent 'chunksize' at a time, and a new
+    chunk is sent whenever one finishes, with at most eight chunks per
+    worker in flight: memory stays bounded however long the input is, and
+    a slow instance only holds up its own chunk.  With 'ordered' results
+    come out in input order; otherwise each chunk's are written as soon as
+    it is done.
+
+    If a worker process dies (e.g. killed for running out of memory), the
+    pool is replaced, the chunks that were waiting are sent again and the
+    ones being solved are retried one instance at a time, so only an
+    instance that kills its worker a second time is reported with an
+    'error'.  Each worker opens its own copy of 'cache', sharing the disk
+    tier.  Returns the number of instances.  HDA* is not supported, since
+    it starts processes of its own.
+    """
+    if searchName == 'HDA*':
+        # Every worker would start a full set of HDA* processes per instance
+        raise ValueError("HDA* starts processes of its own, so it cannot run in a pool; use solveBatch")
+    settings = dict(searchName=searchName, heuristicName=heuristicName, goal=goal,
+                    tileCosts=tileCosts, normalize=normalize, options=options, timeout=timeout,
+                    cache=cache)
+    warmUp(searchName, heuristicName, goal, normalize)
+
+    workers = workers or multiprocessing.cpu_count()
+    limit = workers * 8
+    tasks = enumerate(instances, 1)
+    chunks = iter(lambda: list(itertools.islice(tasks, chunksize)), [])
+    pending = collections.deque()  # [chunk, future or None if unsent], in input order
+    pool = _WorkerPool(workers, settings)
+    count = 0
+    try:
+        while True:
+            try:
+                for entry in pending:
+                    if entry[1] is None:
+                        entry[1] = pool.submit(entry[0])
+                while len(pending) < limit:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    entry = [chunk, None]
+                    pending.append(entry)
+                    entry[1] = pool.submit(chunk)
+                if not pending:
+                    break
+
+                if ordered:
+                    concurrent.futures.wait([pending[0][1]])
+                    finished = [pending[0]]
+                else:
+                    done, _ = concurrent.futures.wait([future for _, future in pending],
+                                                      return_when=concurrent.futures.FIRST_COMPLETED)
+                    finished = [entry for entry in pending if entry[1] in done]
+
+                for entry in finished:
+                    results = entry[1].result()
+                    pending.remove(entry)
+                    for result in results:
+                        out.write(json.dumps(result) + '\n')
+                    out.flush()
+                    count += len(entry[0])
+            except BrokenProcessPool:
+                _recover(pool, pending)
+    finally:
+        pool.shutdown()
+    return count
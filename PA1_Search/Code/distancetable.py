@@ -0,0 +1,97 @@
+# distancetable.py
+# ----------------
+# Exact distance-to-goal tables for the eight puzzle.
+
+
+"""
+Only 9!/2 = 181,440 boards can reach a given goal, so the exact number of
+moves from every board to the goal fits in one byte per permutation.  The
+table is built by a breadth-first search backwards from the goal and indexed
+by the board's Lehmer-code rank (0 .. 9!-1); boards of the other parity keep
+the value UNREACHED.
+"""
+
+from collections import deque
+
+import util
+
+UNREACHED = 255
+
+FACTORIALS = (40320, 5040, 720, 120, 24, 6, 2, 1, 1)
+
+# POPCOUNT[m] is the number of bits set in the 9-bit mask m
+POPCOUNT = bytes(bin(mask).count('1') for mask in range(512))
+
+def rankBoard(board):
+    """
+    Returns the Lehmer-code rank of a packed board: the position of its
+    permutation of 0..8 in lexicographic order, reading cells 0 to 8.
+    """
+    rank = 0
+    used = 0
+    for cell in range(9):
+        tile = (board >> (cell << 2)) & 15
+        # Numbers smaller than 'tile' that have not been placed yet
+        rank += (tile - POPCOUNT[used & ((1 << tile) - 1)]) * FACTORIALS[cell]
+        used |= 1 << tile
+    return rank
+
+def unrankBoard(rank):
+    "Returns the packed board whose rankBoard() is 'rank'."
+    remaining = list(range(9))
+    board = 0
+    for cell in range(9):
+        digit, rank = divmod(rank, FACTORIALS[cell])
+        board |= remaining.pop(digit) << (cell << 2)
+    return board
+
+NEIGHBOURS = util.gridNeighbours(3)
+
+def build(goalBoard):
+    "Returns the distance table for goalBoard as bytes, one per rank."
+    goalBlank = 0
+    while (goalBoard >> (goalBlank << 2)) & 15:
+        goalBlank += 1
+
+    # Search over boards first, then rank each of them once
+    distances = {goalBoard: 0}
+    fringe = deque([(goalBoard, goalBlank)])
+    while fringe:
+        board, blank = fringe.popleft()
+        distance = distances[board] + 1
+        for _, target in NEIGHBOURS[blank]:
+            tile = (board >> (target << 2)) & 15
+            nextBoard = board + (tile << (blank << 2)) - (tile << (target << 2))
+            if nextBoard not in distances:
+                distances[nextBoard] = distance
+                fringe.append((nextBoard, target))
+
+    table = bytearray([UNREACHED]) * FACTORIALS[0] * 9
+    for board, distance in distances.items():
+        table[rankBoard(board)] = distance
+    return bytes(table)
+
+class DistanceTable:
+    """
+    Exact distances to one goal board, one byte per rank in 'data', the
+    table called 'name' in util.tableRegistry.
+    """
+    def __init__(self, goalBoard, data, name=None):
+        self.goalBoard = goalBoard
+        self.data = data
+        self.name = name
+
+    def distance(self, board):
+        "Returns the number of moves from 'board' to the goal, or UNREACHED."
+        return self.data[rankBoard(board)]
+
+def load(goalBoard):
+    "Returns the DistanceTable for goalBoard, building it only if no process has yet."
+    name = 'dist_%09x.bin' % goalBoard
+    return DistanceTable(goalBoard, util.loadTable(name, lambda: build(goalBoard)), name)
+
+_tables = util.TableCache(load)
+
+def distanceTable(goalBoard):
+    "Returns the cached DistanceTable for goalBoard."
+    return _tables.get(goalBoard)
@@ -13,13 +13,88 @@
 
 
 import search
+import hdastar
+import vectorbfs
+import solutioncache
+import util
+import distancetable
+import patterndb
 import random
 import argparse
 import time
 import json
+import sys
 
 # Module Classes
 
+# Boards are packed into a single integer, four bits per cell, with cell
+# (row, col) stored in the nibble at index 3 * row + col.  Moving the blank
+# is then a single swap of two nibbles, and since the blank holds 0 the swap
+# is one add and one subtract: board + (tile << blankShift) - (tile << tileShift).
+MOVES = ('up', 'down', 'left', 'right')
+
+NEIGHBOURS = util.gridNeighbours(3)
+MOVE_TARGETS = tuple(dict(moves) for moves in NEIGHBOURS)
+
+# SWAPS[blank] holds (move, target, blankShift, targetShift) for each legal
+# move: the bit offsets of the two nibbles the move exchanges
+SWAPS = tuple(tuple((move, target, blank << 2, target << 2) for move, target in NEIGHBOURS[blank])
+              for blank in range(9))
+
+MOVE_DELTAS = {'up': (-1, 0), 'down': (1, 0), 'left': (0, -1), 'right': (0, 1)}
+INVERSE_MOVES = {'up': 'down', 'down': 'up', 'left': 'right', 'right': 'left'}
+
+def _symmetry(transform):
+    """
+    Returns (cellMap, moveMap) for a symmetry of the square given as a
+    function of (row, col): cellMap[cell] is where 'cell' goes and
+    moveMap[move] is the move pointing the same way after the transform.
+    """
+    cellMap = []
+    for cell in range(9):
+        row, col = transform(*divmod(cell, 3))
+        cellMap.append(3 * row + col)
+    moveMap = {}
+    centreRow, centreCol = transform(1, 1)
+    for move, (dr, dc) in MOVE_DELTAS.items():
+        row, col = transform(1 + dr, 1 + dc)
+        for other, delta in MOVE_DELTAS.items():
+            if delta == (row - centreRow, col - centreCol):
+                moveMap[move] = other
+    return tuple(cellMap), moveMap
+
+# The eight rotations and reflections of the board
+SYMMETRIES = tuple(_symmetry(transform) for transform in (
+    lambda row, col: (row, col),
+    lambda row, col: (row, 2 - col),
+    lambda row, col: (2 - row, col),
+    lambda row, col: (2 - row, 2 - col),
+    lambda row, col: (col, row),
+    lambda row, col: (col, 2 - row),
+    lambda row, col: (2 - col, row),
+    lambda row, col: (2 - col, 2 - row),
+))
+
+# Every blank cell maps onto a corner, an edge or the centre
+CANONICAL_BLANKS = (0, 1, 4)
+
+def packNumbers(numbers):
+    "Packs a list of nine numbers into a board integer."
+    board = 0
+    for index, number in enumerate(numbers):
+        board |= number << (index << 2)
+    return board
+
+def unpackBoard(board):
+    "Returns the list of nine numbers stored in a board integer."
+    return [(board >> (index << 2)) & 15 for index in range(9)]
+
+GOAL_BOARD = packNumbers([0, 1, 2, 3, 4, 5, 6, 7, 8])
+
+# The goals of normalized problems: the tiles read 1..8 around the blank
+CANONICAL_GOALS = tuple(packNumbers([0 if cell == blank else cell + (cell < blank) for cell in range(9)])
+                        for blank in CANONICAL_BLANKS)
+
 class EightPuzzleState:
     """
     The Eight Puzzle is described in the course textbook on
@@ -29,6 +104,18 @@ class EightPuzzleState:
     task of recasting this puzzle as a search problem is left to
     the EightPuzzleSearchProblem class.
     """
+    __slots__ = ('board', 'blank')
+
+    # Board layout for searches and heuristics that work on the packed
+    # board directly; slidingpuzzle.SlidingPuzzleState has the same fields
+    size = 3
+    cellCount = 9
+    bits = 4
+    mask = 15
+    neighbours = NEIGHBOURS
+    moveTargets = MOVE_TARGETS
+    swaps = SWAPS
+    goalBoard = GOAL_BOARD
 
     def __init__( self, numbers ):
         """
@@ -49,18 +136,47 @@ class EightPuzzleState:
             | 6 | 7 | 8 |
             ------------
 
-        The configuration of the puzzle is stored in a 2-dimensional
-        list (a list of lists) 'cells'.
+        The configuration of the puzzle is stored as a packed integer
+        'board' (see packNumbers) together with the index of the blank
+        cell.  The 2-dimensional 'cells' view is rebuilt on demand.
+        """
+        self.board = packNumbers(numbers)
+        self.blank = list(numbers).index(0)
+
+    @classmethod
+    def fromBoard(cls, board, blank):
+        "Builds a state directly from a packed board and its blank index."
+        state = object.__new__(cls)
+        state.board = board
+        state.blank = blank
+        return state
+
+    @classmethod
+    def fromRank(cls, rank):
+        "Builds the state whose rank() is 'rank'."
+        board = distancetable.unrankBoard(rank)
+        return cls.fromBoard(board, unpackBoard(board).index(0))
+
+    def rank(self):
         """
-        self.cells = []
-        numbers = numbers[:] # Make a copy so as not to cause side-effects.
-        numbers.reverse()
-        for row in range( 3 ):
-            self.cells.append( [] )
-            for col in range( 3 ):
-                self.cells[row].append( numbers.pop() )
-                if self.cells[row][col] == 0:
-                    self.blankLocation = row, col
+          Returns the Lehmer-code rank of this board, from 0 to 9! - 1.
+
+        >>> EightPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8]).rank()
+        0
+        >>> EightPuzzleState.fromRank(12345) == EightPuzzleState.fromRank(12345)
+        True
+        """
+        return distancetable.rankBoard(self.board)
+
+    @property
+    def cells(self):
+        "The board as a list of three rows, for display."
+        numbers = unpackBoard(self.board)
+        return [numbers[0:3], numbers[3:6], numbers[6:9]]
+
+    @property
+    def blankLocation(self):
+        return divmod(self.blank, 3)
 
     def isGoal( self ):
         """
@@ -80,13 +196,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).isGoal()
         False
         """
-        current = 0
-        for row in range( 3 ):
-            for col in range( 3 ):
-                if current != self.cells[row][col]:
-                    return False
-                current += 1
-        return True
+        return self.board == GOAL_BOARD
 
     def legalMoves( self ):
         """
@@ -98,17 +208,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8]).legalMoves()
         ['down', 'right']
         """
-        moves = []
-        row, col = self.blankLocation
-        if(row != 0):
-            moves.append('up')
-        if(row != 2):
-            moves.append('down')
-        if(col != 0):
-            moves.append('left')
-        if(col != 2):
-            moves.append('right')
-        return moves
+        return [move for move, _ in NEIGHBOURS[self.blank]]
 
     def result(self, move):
         """
@@ -116,37 +216,19 @@ class EightPuzzleState:
         updated based on the provided move.
 
         The move should be a string drawn from a list returned by legalMoves.
-        Illegal moves will raise an exception, which may be an array bounds
-        exception.
+        Illegal moves will raise a ValueError.
 
         NOTE: This function *does not* change the current object.  Instead,
         it returns a new object.
         """
-        row, col = self.blankLocation
-        if(move == 'up'):
-            newrow = row - 1
-            newcol = col
-        elif(move == 'down'):
-            newrow = row + 1
-            newcol = col
-        elif(move == 'left'):
-            newrow = row
-            newcol = col - 1
-        elif(move == 'right'):
-            newrow = row
-            newcol = col + 1
-        else:
-            raise "Illegal Move"
-
-        # Create a copy of the current eightPuzzle
-        newPuzzle = EightPuzzleState([0, 0, 0, 0, 0, 0, 0, 0, 0])
-        newPuzzle.cells = [values[:] for values in self.cells]
-        # And update it to reflect the move
-        newPuzzle.cells[row][col] = self.cells[newrow][newcol]
-        newPuzzle.cells[newrow][newcol] = self.cells[row][col]
-        newPuzzle.blankLocation = newrow, newcol
+        blank = self.blank
+        target = MOVE_TARGETS[blank].get(move)
+        if target is None:
+            raise ValueError("Illegal Move: %s" % move)
 
-        return newPuzzle
+        tile = (self.board >> (target << 2)) & 15
+        board = self.board + (tile << (blank << 2)) - (tile << (target << 2))
+        return EightPuzzleState.fromBoard(board, target)
 
     # Utilities for comparison and display
     def __eq__(self, other):
@@ -158,13 +240,10 @@ class EightPuzzleState:
               EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left')
           True
         """
-        for row in range( 3 ):
-            if self.cells[row] != other.cells[row]:
-                return False
-        return True
+        return isinstance(other, EightPuzzleState) and self.board == other.board
 
     def __hash__(self):
-        return hash(str(self.cells))
+        return hash(self.board)
 
     def __getAsciiString(self):
         """
@@ -193,8 +272,12 @@ class EightPuzzleSearchProblem(search.SearchProblem):
       Implementation of a SearchProblem for the  Eight Puzzle domain
 
       Each state is represented by an instance of an eightPuzzle.
+
+      tileCosts optionally gives the cost of sliding each tile, indexed by
+      tile number (see TILE_WEIGHTED_COSTS).  When it is None every move
+      costs 1.
     """
-    def __init__(self,puzzle, goal = None):
+    def __init__(self,puzzle, goal = None, tileCosts = None):
         "Creates a new EightPuzzleSearchProblem which stores search information."
         self.puzzle = puzzle
         
@@ -204,6 +287,8 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         else:
             self.goal = goal
 
+        self.tileCosts = tileCosts
+
 
     def getStartState(self):
         return self.puzzle
@@ -215,13 +300,59 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         """
           Returns list of (successor, action, stepCost) pairs where
           each succesor is either left, right, up, or down
-          from the original state and the cost is 1.0 for each
+          from the original state and the cost is the cost of the
+          tile that slid (1.0 for each move unless tileCosts is set)
         """
+        board = state.board
+        tileCosts = self.tileCosts
+        newState = object.__new__
         succ = []
-        for a in state.legalMoves():
-            succ.append((state.result(a), a, 1))
+        for move, target, blankShift, targetShift in SWAPS[state.blank]:
+            tile = (board >> targetShift) & 15
+            nextState = newState(EightPuzzleState)
+            nextState.board = board + (tile << blankShift) - (tile << targetShift)
+            nextState.blank = target
+            succ.append((nextState, move, 1 if tileCosts is None else tileCosts[tile]))
         return succ
 
+    def iterSuccessors(self, state):
+        """
+          Yields the same (successor, action, stepCost) triples as
+        getSuccessors, one at a time, so a search can stop part way
+        through a node's children without building the rest.
+
+        >>> problem = EightPuzzleSearchProblem(EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]))
+        >>> start = problem.getStartState()
+        >>> list(problem.iterSuccessors(start)) == problem.getSuccessors(start)
+        True
+        """
+        board = state.board
+        tileCosts = self.tileCosts
+        newState = object.__new__
+        for move, target, blankShift, targetShift in SWAPS[state.blank]:
+            tile = (board >> targetShift) & 15
+            nextState = newState(EightPuzzleState)
+            nextState.board = board + (tile << blankShift) - (tile << targetShift)
+            nextState.blank = target
+            yield nextState, move, 1 if tileCosts is None else tileCosts[tile]
+
+    def getGoalState(self):
+        return self.goal
+
+    def getPredecessors(self,state):
+        """
+          Returns list of (predecessor, action, stepCost) triples where
+          'action' takes 'predecessor' to 'state'.  Moves are reversible,
+          so these are the successors with the inverse moves.
+        """
+        # The same tile slides back, at the same cost
+        return [(prevState, INVERSE_MOVES[move], stepCost)
+                for prevState, move, stepCost in self.getSuccessors(state)]
+
+    def reverse(self):
+        "Returns the problem of getting from the goal back to the start."
+        return EightPuzzleSearchProblem(self.goal, self.puzzle, self.tileCosts)
+
     def getCostOfActions(self, actions):
         """
          actions: A list of actions to take
@@ -229,7 +360,75 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         This method returns the total cost of a particular sequence of actions.  The sequence must
         be composed of legal moves
         """
-        return len(actions)
+        if self.tileCosts is None:
+            return len(actions)
+        cost = 0
+        state = self.puzzle
+        for action in actions:
+            nextState = state.result(action)
+            cost += self.tileCosts[(nextState.board >> (state.blank << 2)) & 15]
+            state = nextState
+        return cost
+
+    def normalized(self):
+        """
+          Returns (problem, actionMap): an equivalent problem whose goal is
+        canonical, and a dict mapping its actions back to this problem's.
+
+        The board is first rotated or reflected so the goal's blank lands
+        on cell 0, 1 or 4, then tiles are relabelled so the goal reads 1..8
+        around the blank.  Relabelling does not change which moves are
+        legal, so a path for the canonical problem, translated through
+        actionMap, solves this one.  At most three goals are ever seen by
+        the canonical problems, so per-goal tables are shared between
+        queries.
+
+        >>> problem, actionMap = EightPuzzleSearchProblem(
+        ...     EightPuzzleState([1, 2, 3, 4, 5, 6, 7, 0, 8]),
+        ...     EightPuzzleState([1, 2, 3, 4, 5, 6, 7, 8, 0])).normalized()
+        >>> problem.goal == EightPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8])
+        True
+        """
+        problem, _, _, _, actionMap = self.canonicalForm()
+        return problem, actionMap
+
+    def canonicalForm(self):
+        """
+          Returns (problem, transform, cellMap, relabel, actionMap): the
+        problem of normalized(), the function taking a state of this problem
+        to the equivalent state of that one, where each cell goes, what each
+        tile becomes, and the map of its actions back to this problem's.
+        """
+        for cellMap, moveMap in SYMMETRIES:
+            blank = cellMap[self.goal.blank]
+            if blank in CANONICAL_BLANKS:
+                break
+
+        relabel = [0] * 9
+        for cell, tile in enumerate(unpackBoard(self.goal.board)):
+            if tile != 0:
+                target = cellMap[cell]
+                relabel[tile] = target + 1 if target < blank else target
+
+        def transform(state):
+            numbers = [0] * 9
+            for cell, tile in enumerate(unpackBoard(state.board)):
+                numbers[cellMap[cell]] = relabel[tile]
+            return EightPuzzleState(numbers)
+
+        tileCosts = None
+        if self.tileCosts is not None:
+            tileCosts = [0] * 9
+            for tile in range(9):
+                tileCosts[relabel[tile]] = self.tileCosts[tile]
+            tileCosts = tuple(tileCosts)
+
+        problem = EightPuzzleSearchProblem(transform(self.puzzle), transform(self.goal), tileCosts)
+        actionMap = dict((move, original) for original, move in moveMap.items())
+        return problem, transform, cellMap, relabel, actionMap
+
+# Moving tile k costs k
+TILE_WEIGHTED_COSTS = tuple(range(9))
 
 EIGHT_PUZZLE_DATA = [[1, 0, 2, 3, 4, 5, 6, 7, 8],
                      [1, 7, 8, 2, 3, 4, 5, 6, 0],
@@ -289,8 +488,82 @@ def parse_grid(grid_string):
 
 
 
+HEURISTICS = {
+    'misplaced': search.misplacedTilesHeuristic,
+    'manhattan': search.manhattanDistanceHeuristic,
+    'other': search.patternDatabaseHeuristic,
+    'exact': search.exactDistanceHeuristic,
+}
+
+# name: (search function, takes a heuristic, takes search_options())
+SEARCHES = {
+    'DFS': (search.depthFirstSearch, False, True),
+    'BFS': (search.breadthFirstSearch, False, True),
+    'IDS': (search.iterativeDeepeningSearch, False, False),
+    'UCS': (search.uniformCostSearch, False, True),
+    'GBS': (search.greedyBestFirstSearch, True, True),
+    'A*': (search.aStarSearch, True, True),
+    'IDA*': (search.idaStarSearch, True, False),
+    'HDA*': (hdastar.hashDistributedAStarSearch, True, False),
+    'VecBFS': (vectorbfs.vectorizedBreadthFirstSearch, False, False),
+    'BiBFS': (search.bidirectionalBreadthFirstSearch, False, False),
+    'BiA*': (search.bidirectionalAStarSearch, True, False),
+    'Oracle': (search.distanceOracleSearch, False, False),
+}
+
+# What works on 4x4 and 5x5 grids (see slidingpuzzle.py); the other searches
+# and heuristics rely on tables of every eight puzzle board
+SLIDING_PUZZLE_SEARCHES = ('DFS', 'BFS', 'IDS', 'UCS', 'GBS', 'A*', 'IDA*', 'HDA*', 'BiBFS', 'BiA*')
+SLIDING_PUZZLE_HEURISTICS = ('misplaced', 'manhattan')
+
+# The per-goal tables (see util.tableRegistry) behind heuristics and searches
+HEURISTIC_TABLES = {'other': patterndb.patternDatabase, 'exact': distancetable.distanceTable}
+SEARCH_TABLES = {'Oracle': distancetable.distanceTable}
+
+def loadTables(searchName, heuristicName=None, goal=None, normalize=False):
+    """
+      Loads the pattern databases and distance tables that 'searchName'
+    (with 'heuristicName') needs to solve for 'goal', building and saving
+    any that are missing, so that processes started afterwards map them
+    instead of each building its own.  BiA* evaluates its backward
+    heuristic against one of the CANONICAL_GOALS, so their tables are
+    loaded too.
+    """
+    loaders = [SEARCH_TABLES.get(searchName)]
+    if SEARCHES[searchName][1]:
+        loaders.append(HEURISTIC_TABLES.get(heuristicName))
+    loaders = [loader for loader in loaders if loader is not None]
+    if not loaders:
+        return
+    goal = goal or EightPuzzleState.fromBoard(GOAL_BOARD, 0)
+    if normalize:
+        goal = EightPuzzleSearchProblem(goal, goal).normalized()[0].goal
+    goalBoards = [goal.board]
+    if searchName == 'BiA*':
+        goalBoards.extend(board for board in CANONICAL_GOALS if board != goal.board)
+    for loader in loaders:
+        for goalBoard in goalBoards:
+            loader(goalBoard)
+
+def search_options(frontier=None, tie_breaking=None, early_goal=False, lazy=False, batched=False):
+    """
+    Returns the keyword arguments for searches that take search options.
+    A configured frontier holds its nodes, so build a fresh dict for each
+    search rather than sharing one.
+    """
+    options = {'frontier': frontier} if frontier else {}
+    if tie_breaking:
+        options['frontier'] = util.TwoLevelBucketFrontier(tie_breaking)
+    if early_goal:
+        options['earlyGoal'] = True
+    if lazy:
+        options['lazy'] = True
+    if batched:
+        options['batched'] = True
+    return options
+
 # Had claude generate this
-def run_search(problem, search_func, search_name, initial_state, heuristic=None):
+def run_search(problem, search_func, search_name, initial_state, heuristic=None, normalize=False, stats=None, options=None, verbose=True, cache=None):
     """
     Generic function to run any search algorithm and track metrics.
     
@@ -300,31 +573,75 @@ def run_search(problem, search_func, search_name, initial_state, heuristic=None)
         search_name: Name of the algorithm (e.g., 'DFS', 'BFS')
         initial_state: The initial puzzle state
         heuristic: Heuristic function (for informed search)
+        normalize: Solve the canonical-goal form of the problem (see
+            EightPuzzleSearchProblem.normalized) and map the path back
+        stats: A dict passed to search functions that report extra
+            statistics; it is returned as metrics['stats']
+        options: Extra keyword arguments for search_func (e.g. frontier)
+        verbose: Print the name of the search before running it
+        cache: A solutioncache.SolutionCache to answer repeated queries
+            from; metrics['cached'] tells whether it did, and the stats are
+            those of the search that found the answer
     """
-    print(f"Running {search_name}...")
+    if verbose:
+        print(f"Running {search_name}...")
     
     start_time = time.time()
+
+    if cache is not None:
+        key = solutioncache.queryKey(problem, search_name, heuristic, normalize, options)
+        stored, tier = cache.get(key)
+        if stored is not None:
+            if stats is not None:
+                stats.update(stored['stats'] or {})
+            if verbose:
+                print(f"Answered from the {tier} cache")
+            return {
+                'search_name': search_name,
+                'path': stored['path'],
+                'path_cost': stored['path_cost'],
+                'nodes_expanded': stored['nodes_expanded'],
+                'max_depth': stored['max_depth'],
+                'time': time.time() - start_time,
+                'initial_state': initial_state,
+                'stats': stats,
+                'cached': True
+            }
+
+    solved = problem
+    if normalize:
+        solved, action_map = problem.normalized()
     
     # Call the search function (with or without heuristic)
+    kwargs = dict(options or {})
+    if stats is not None:
+        kwargs['stats'] = stats
     if heuristic:
-        result = search_func(problem, heuristic)
+        result = search_func(solved, heuristic, **kwargs)
     else:
-        result = search_func(problem)
-    
-    end_time = time.time()
+        result = search_func(solved, **kwargs)
     
     # Unpack result (all search functions should return same format)
     path, nodes_expanded, max_depth = result
+    if normalize:
+        path = [action_map[action] for action in path]
+    
+    end_time = time.time()
     
-    return {
+    metrics = {
         'search_name': search_name,
         'path': path,
-        'path_cost': len(path),
+        'path_cost': problem.getCostOfActions(path),
         'nodes_expanded': nodes_expanded,
         'max_depth': max_depth,
         'time': end_time - start_time,
-        'initial_state': initial_state
+        'initial_state': initial_state,
+        'stats': stats,
+        'cached': False
     }
+    if cache is not None:
+        cache.put(key, metrics)
+    return metrics
 
 def write_output(metrics, problem, heuristic_name=None):
     """
@@ -336,7 +653,7 @@ def write_output(metrics, problem, heuristic_name=None):
     # Build filename according to assignment requirements
     safe_search_name = search_name.replace('*', 'star')
     
-    if heuristic_name and search_name in ['GBS', 'A*']:
+    if heuristic_name and search_name in ['GBS', 'A*', 'IDA*', 'HDA*', 'BiA*']:
         filename = f"output_{safe_search_name}_{heuristic_name}.txt"
     else:
         filename = f"output_{safe_search_name}.txt"
@@ -382,7 +699,16 @@ def write_output(metrics, problem, heuristic_name=None):
         f.write(f"Nodes Expanded: {metrics['nodes_expanded']}\n")
         f.write(f"Search Depth: {metrics['max_depth']}\n")
         f.write(f"Time Taken: {metrics['time']:.6f} seconds\n")
+        if metrics.get('cached'):
+            f.write("Cached: yes\n")
         f.write("=" * 50 + "\n")
+
+        if metrics.get('stats'):
+            f.write("SEARCH STATS:\n")
+            f.write("=" * 50 + "\n")
+            for name, value in metrics['stats'].items():
+                f.write(f"{name}: {value}\n")
+            f.write("=" * 50 + "\n")
     
     print(f"\nResults written to {filename}")
     print(f"Path Cost: {metrics['path_cost']}")
@@ -395,73 +721,174 @@ def write_output(metrics, problem, heuristic_name=None):
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Solve 8-Puzzle using various search algorithms')
     parser.add_argument('--search', type=str, required=True,
-                       choices=['BFS', 'DFS', 'IDS', 'UCS', 'GBS', 'A*', 'Beam'],
+                       choices=['BFS', 'DFS', 'IDS', 'UCS', 'GBS', 'A*', 'IDA*', 'HDA*', 'VecBFS', 'BiBFS', 'BiA*', 'Beam', 'Oracle', 'Portfolio'],
                        help='Search algorithm to use')
-    parser.add_argument('--initial', type=str, required=True,
-                       help='Initial state as a 2D grid, e.g., "[[-,2,3],[1,4,5],[8,7,6]]"')
-    parser.add_argument('--goal', type=str, required=True,
+    parser.add_argument('--initial', type=str, default=None,
+                       help='Initial state as a 2D grid, e.g., "[[-,2,3],[1,4,5],[8,7,6]]"; 4x4 and 5x5 grids are also accepted')
+    parser.add_argument('--goal', type=str, default=None,
                        help='Goal state as a 2D grid, e.g., "[[1,2,3],[8,-,4],[7,6,5]]"')
     parser.add_argument('--heuristic', type=str, default='misplaced',
-                       choices=['misplaced', 'manhattan', 'other'],
+                       choices=list(HEURISTICS),
                        help='Heuristic function for informed search')
+    parser.add_argument('--cost', type=str, default='unit',
+                       choices=['unit', 'tile'],
+                       help='Step cost: 1 per move, or the number of the tile moved')
+    parser.add_argument('--frontier', type=str, default=None,
+                       choices=list(util.FRONTIERS),
+                       help='Frontier for DFS, BFS, UCS, GBS and A* (default: the usual one for each)')
+    parser.add_argument('--tie-breaking', type=str, default=None,
+                       choices=list(util.TwoLevelBucketFrontier.TIE_BREAKING),
+                       help='Tie-breaking within an f-layer for the two-level bucket frontier')
+    parser.add_argument('--normalize', action='store_true',
+                       help='Solve in canonical-goal form so precomputed tables are shared across goals')
+    parser.add_argument('--early-goal', action='store_true',
+                       help='DFS/BFS: test successors for the goal when they are generated')
+    parser.add_argument('--lazy', action='store_true',
+                       help='DFS/BFS: generate successors one at a time')
+    parser.add_argument('--batched-heuristic', action='store_true',
+                       help='GBS/A*: score all successors of an expansion in one NumPy call')
+    parser.add_argument('--batch', type=str, default=None,
+                       help='Solve every instance in a JSONL or CSV file ("-" for stdin) and print one JSON result per line')
+    parser.add_argument('--batch-format', type=str, default=None,
+                       choices=['jsonl', 'csv'],
+                       help='Format of the --batch input (default: from the file extension, jsonl for stdin)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes for --batch (default 1) or HDA* (default one per CPU); 0 for one per CPU')
+    parser.add_argument('--chunksize', type=int, default=1,
+                       help='Instances sent to a --batch worker at a time')
+    parser.add_argument('--timeout', type=int, default=None,
+                       help='Seconds allowed per --batch instance or --search Portfolio race')
+    parser.add_argument('--unordered', action='store_true',
+                       help='Write --batch results as they finish rather than in input order')
+    parser.add_argument('--portfolio', type=str, default=None,
+                       help='Entries raced by --search Portfolio, e.g. "A*:manhattan,IDA*:other,BiBFS"')
+    parser.add_argument('--require', type=str, default='any',
+                       choices=['any', 'optimal'],
+                       help='Portfolio: take the first solution, or the first from an entry proven optimal')
+    parser.add_argument('--cache', action='store_true',
+                       help='Answer repeated queries from a solution cache kept in memory and on disk')
+    parser.add_argument('--cache-file', type=str, default=solutioncache.DEFAULT_PATH,
+                       help='SQLite file of the --cache disk tier')
+    parser.add_argument('--cache-memory', type=int, default=32,
+                       help='Megabytes of answers kept in the --cache memory tier')
+    parser.add_argument('--cache-entries', type=int, default=None,
+                       help='Most answers kept in the --cache file (default: no limit)')
     
     args = parser.parse_args()
+    if (args.frontier or args.tie_breaking) and args.search not in ['DFS', 'BFS', 'UCS', 'GBS', 'A*']:
+        parser.error('--frontier only applies to DFS, BFS, UCS, GBS and A*')
+    if args.tie_breaking and args.frontier not in [None, 'two-level']:
+        parser.error('--tie-breaking needs --frontier two-level')
+    if args.search == 'DFS' and (args.frontier in ['bucket', 'two-level'] or args.tie_breaking):
+        parser.error('DFS puts the deepest node first with negative priorities, which the bucket frontiers cannot hold')
+    if (args.early_goal or args.lazy) and args.search not in ['DFS', 'BFS']:
+        parser.error('--early-goal and --lazy only apply to DFS and BFS')
+    if args.batched_heuristic and args.search not in ['GBS', 'A*']:
+        parser.error('--batched-heuristic only applies to GBS and A*')
+    if args.batched_heuristic and search.np is None:
+        parser.error('--batched-heuristic needs NumPy (pip install numpy)')
+    if args.batch is None and (args.initial is None or args.goal is None):
+        parser.error('--initial and --goal are required unless --batch is given')
+    if args.search == 'Portfolio' and args.batch is not None:
+        parser.error('--batch does not support Portfolio')
+    if args.search == 'HDA*' and args.batch is not None and args.workers not in [None, 1]:
+        parser.error('--batch --workers does not support HDA*, which starts processes of its own')
+    if args.search == 'Portfolio' and args.cache:
+        parser.error('--cache does not support Portfolio')
+    if args.search not in SEARCHES and args.search != 'Portfolio':
+        parser.error('%s is not implemented' % args.search)
+    if args.search == 'VecBFS' and vectorbfs.np is None:
+        parser.error('VecBFS needs NumPy (pip install numpy)')
+    
+    search_func, uses_heuristic, takes_options = SEARCHES.get(args.search, (None, False, False))
+    heuristic_name = args.heuristic if uses_heuristic else None
+    tile_costs = TILE_WEIGHTED_COSTS if args.cost == 'tile' else None
+    options = dict(frontier=args.frontier, tie_breaking=args.tie_breaking,
+                   early_goal=args.early_goal, lazy=args.lazy, batched=args.batched_heuristic)
+    cache = None
+    if args.cache:
+        cache = solutioncache.SolutionCache(args.cache_file, args.cache_memory * 1024 * 1024, args.cache_entries)
+    
+    if args.batch is not None:
+        import batch
+        # batch imports this file as 'eightpuzzle', whose states are not
+        # the same class as this script's, so let it parse the goal
+        goal = batch.parseState(args.goal) if args.goal else None
+        batch_format = args.batch_format or ('csv' if args.batch.endswith('.csv') else 'jsonl')
+        stream = sys.stdin if args.batch == '-' else open(args.batch, newline='')
+        instances = batch.readInstances(stream, batch_format)
+        with stream:
+            if args.workers in [None, 1]:
+                batch.solveBatch(instances, sys.stdout, args.search, heuristic_name, goal,
+                                 tile_costs, args.normalize, options, args.timeout, cache)
+                if cache is not None:
+                    print(json.dumps({'cache': cache.counters}), file=sys.stderr)
+            else:
+                batch.solveParallel(instances, sys.stdout, args.search, heuristic_name, goal,
+                                    tile_costs, args.normalize, options, args.timeout,
+                                    args.workers or None, args.chunksize, not args.unordered, cache)
+        sys.exit(0)
     
     # Parse initial and goal states
     print("Parsing input...")
     initial_numbers = parse_grid(args.initial)
     goal_numbers = parse_grid(args.goal)
     
-    # Create puzzle states
-    puzzle = EightPuzzleState(initial_numbers)
-    goal = EightPuzzleState(goal_numbers)
+    # Create puzzle states and the search problem with custom goal
+    if len(initial_numbers) == 9:
+        puzzle = EightPuzzleState(initial_numbers)
+        goal = EightPuzzleState(goal_numbers)
+        problem = EightPuzzleSearchProblem(puzzle, goal, tile_costs)
+    else:
+        import slidingpuzzle
+        if args.search not in SLIDING_PUZZLE_SEARCHES:
+            parser.error('%s only solves 3x3 grids' % args.search)
+        if uses_heuristic and args.heuristic not in SLIDING_PUZZLE_HEURISTICS:
+            parser.error('the %s heuristic only applies to 3x3 grids' % args.heuristic)
+        if args.normalize:
+            parser.error('--normalize only applies to 3x3 grids')
+        try:
+            puzzle = slidingpuzzle.makeState(initial_numbers)
+            goal = slidingpuzzle.makeState(goal_numbers)
+            if args.cost == 'tile':
+                tile_costs = slidingpuzzle.tileWeightedCosts(puzzle.size)
+            problem = slidingpuzzle.SlidingPuzzleSearchProblem(puzzle, goal, tile_costs)
+        except ValueError as error:
+            parser.error(str(error))
     
     print("\nInitial puzzle:")
     print(puzzle)
     print("\nGoal puzzle:")
     print(goal)
     
-    # Create search problem with custom goal
-    problem = EightPuzzleSearchProblem(puzzle, goal)
+    if args.search == 'Portfolio':
+        import portfolio
+        try:
+            entries = portfolio.parseEntries(args.portfolio) if args.portfolio else portfolio.DEFAULT_ENTRIES
+            entry, metrics, race_time = portfolio.race(problem, entries, args.require,
+                                                       args.normalize, args.timeout)
+        except (ValueError, RuntimeError, TimeoutError) as error:
+            parser.exit(1, 'eightpuzzle.py: %s\n' % error)
+        metrics['search_name'] = 'Portfolio'
+        metrics['stats'] = dict(winner=portfolio.entryName(entry), race_time=round(race_time, 6),
+                                optimal=portfolio.isOptimal(entry, tile_costs), **metrics['stats'])
+        write_output(metrics, problem)
+        print(f"Winner: {metrics['stats']['winner']} after {race_time:.6f} seconds")
+        print("\nSearch completed!")
+        sys.exit(0)
     
     # Run selected search algorithm
-    metrics = None
-    heuristic_func = None
-    
-    if args.search == 'DFS':
-        metrics = run_search(problem, search.depthFirstSearch, 'DFS', puzzle)
-        write_output(metrics, problem)
-        
-    elif args.search == 'BFS':
-        metrics = run_search(problem, search.breadthFirstSearch, 'BFS', puzzle)
-        write_output(metrics, problem)
-        
-    elif args.search == 'IDS':
-        metrics = run_search(problem, search.iterativeDeepeningSearch, 'IDS', puzzle)
-        write_output(metrics, problem)
-        
-    elif args.search == 'UCS':
-        metrics = run_search(problem, search.uniformCostSearch, 'UCS', puzzle)
-        write_output(metrics, problem)
-        
-    elif args.search == 'GBS':
-        # Get heuristic function
-        if args.heuristic == 'misplaced':
-            heuristic_func = search.misplacedTilesHeuristic
-        elif args.heuristic == 'manhattan':
-            heuristic_func = search.manhattanDistanceHeuristic
-        
-        metrics = run_search(problem, search.greedyBestFirstSearch, 'GBS', puzzle, heuristic_func)
-        write_output(metrics, problem, args.heuristic)
-        
-    elif args.search == 'A*':
-        # Get heuristic function
-        if args.heuristic == 'misplaced':
-            heuristic_func = search.misplacedTilesHeuristic
-        elif args.heuristic == 'manhattan':
-            heuristic_func = search.manhattanDistanceHeuristic
-        
-        metrics = run_search(problem, search.aStarSearch, 'A*', puzzle, heuristic_func)
-        write_output(metrics, problem, args.heuristic)
+    search_kwargs = search_options(**options) if takes_options else {}
+    if args.search == 'HDA*':
+        search_kwargs['workers'] = args.workers
+    metrics = run_search(problem, search_func, args.search, puzzle,
+                         HEURISTICS[heuristic_name] if uses_heuristic else None,
+                         normalize=args.normalize, stats={}, options=search_kwargs, cache=cache)
+    write_output(metrics, problem, heuristic_name)
+    if cache is not None:
+        counters = cache.counters
+        print(f"Cache: memory {counters['memory']['hits']} hits, {counters['memory']['misses']} misses; "
+              f"disk {counters['disk']['hits']} hits, {counters['disk']['misses']} misses")
+        cache.close()
     
-    print("\nSearch completed!")
\ No newline at end of file
+    print("\nSearch completed!")
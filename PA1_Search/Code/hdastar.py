@@ -0,0 +1,248 @@
+# hdastar.py
+# ----------
+# Hash-distributed A* over several worker processes.
+
+
+"""
+In hash-distributed A* (HDA*) every state has an owner, picked by hashing
+the state (see owner).  Each worker keeps the open list and the best-g
+table for the states it owns.  Successors that belong to another worker
+are sent to it rather than being queued locally, so a state is only ever
+expanded, and checked for duplicates, by its owner.
+
+This implementation works in rounds so that termination is easy to
+detect.  In each round the coordinator (the calling process) tells every
+worker the current f-layer, the best solution cost found so far (the
+incumbent) and how many batches are waiting in its inbox.  The worker
+reads those batches, expands up to 'batchSize' of its nodes whose f is in
+the layer and below the incumbent, sends each other worker at most one
+batch of successors and reports back.  Because the coordinator knows every
+batch in flight and the lowest f in every open list, it can stop exactly
+when no open or in-flight node has f below the incumbent.  With an
+admissible heuristic the incumbent is then optimal.  A cheaper path to a
+state that was already expanded reopens it, so inconsistent heuristics
+are handled too.
+
+The path is rebuilt by asking the owner of each state, starting from the
+goal, for the parent and action it recorded.
+
+States must hash the same way in every process, as the eight puzzle's
+packed boards do.
+"""
+
+import heapq
+import multiprocessing
+import queue
+import time
+
+import search
+
+INFINITY = float('inf')
+
+def owner(state, workers):
+    """
+    Returns the index of the worker that owns 'state'.  The hash is mixed
+    first: a move changes a packed board by a multiple of 15, so the board
+    itself modulo 3, 5 or 15 would never change and one worker would own
+    every reachable state.
+    """
+    return (((hash(state) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % workers
+
+def _worker(index, workers, problem, heuristic, batchSize, commands, inboxes, reports):
+    delta = getattr(heuristic, 'delta', None)
+    table = {}        # state -> (g, parent, action)
+    openList = []     # (f, -g, count, state, depth)
+    count = 0
+    stats = dict(expanded=0, generated=0, duplicates=0, nodes_sent=0, batches_sent=0,
+                 nodes_received=0, communication_time=0.0)
+    maxDepth = 0
+    incumbent = INFINITY
+    candidate = None
+
+    def insert(f, g, state, parent, action, depth):
+        nonlocal count
+        entry = table.get(state)
+        if entry is not None and entry[0] <= g:
+            stats['duplicates'] += 1
+            return
+        table[state] = (g, parent, action)
+        count += 1
+        heapq.heappush(openList, (f, -g, count, state, depth))
+
+    def receive(expected):
+        started = time.time()
+        batches = [inboxes[index].get() for _ in range(expected)]
+        stats['communication_time'] += time.time() - started
+        for batch in batches:
+            stats['nodes_received'] += len(batch)
+            for node in batch:
+                insert(*node)
+
+    while True:
+        try:
+            command = commands[index].get(timeout=1)
+        except queue.Empty:
+            # Stop if the coordinator was killed (e.g. a portfolio race ended)
+            if not multiprocessing.parent_process().is_alive():
+                return
+            continue
+        kind = command[0]
+
+        if kind == 'round':
+            _, layer, incumbent, expected = command
+            receive(expected)
+            outgoing = [[] for _ in range(workers)]
+            sentMinF = INFINITY
+            expanded = 0
+            while openList and expanded < batchSize:
+                f, negG, _, state, depth = openList[0]
+                g = -negG
+                if f > layer or f >= incumbent:
+                    break
+                heapq.heappop(openList)
+                if g > table[state][0]:
+                    continue # A cheaper copy was queued later
+                expanded += 1
+                maxDepth = max(maxDepth, depth)
+                if problem.isGoalState(state):
+                    if g < incumbent:
+                        incumbent, candidate = g, state
+                    continue
+                h = f - g
+                for child, action, stepCost in problem.getSuccessors(state):
+                    stats['generated'] += 1
+                    childG = g + stepCost
+                    childF = childG + search.childHeuristic(heuristic, delta, h, state, child, problem)
+                    if problem.isGoalState(child) and childG < incumbent:
+                        incumbent, candidate = childG, child
+                    childOwner = owner(child, workers)
+                    if childOwner == index:
+                        insert(childF, childG, child, state, action, depth + 1)
+                    else:
+                        outgoing[childOwner].append((childF, childG, child, state, action, depth + 1))
+                        sentMinF = min(sentMinF, childF)
+            stats['expanded'] += expanded
+
+            started = time.time()
+            sent = [0] * workers
+            for other, batch in enumerate(outgoing):
+                if batch:
+                    inboxes[other].put(batch)
+                    sent[other] = 1
+                    stats['nodes_sent'] += len(batch)
+                    stats['batches_sent'] += 1
+            stats['communication_time'] += time.time() - started
+
+            # Stale entries only make this lower, which is safe
+            openMinF = openList[0][0] if openList else INFINITY
+            reports.put((index, openMinF, sentMinF, sent, incumbent, candidate))
+
+        elif kind == 'drain':
+            receive(command[1])
+            reports.put((index,))
+
+        elif kind == 'parent':
+            g, parent, action = table[command[1]]
+            reports.put((index, parent, action))
+
+        elif kind == 'stop':
+            stats['communication_time'] = round(stats['communication_time'], 6)
+            reports.put((index, stats, maxDepth))
+            return
+
+def hashDistributedAStarSearch(problem, heuristic=search.nullHeuristic, stats=None, workers=None, batchSize=256):
+    """
+    Searches with A* spread over 'workers' processes (default: one per CPU),
+    each expanding at most 'batchSize' nodes per round.  Returns the path,
+    the total number of nodes expanded and the deepest node expanded.
+
+    If 'stats' is a dict it receives the number of rounds and, for each
+    worker, its expansions, successors generated, duplicates dropped, nodes
+    and batches sent and received, and the time spent on queues.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    start = problem.getStartState()
+    commands = [multiprocessing.Queue() for _ in range(workers)]
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    reports = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_worker, daemon=True,
+                                         args=(index, workers, problem, heuristic, batchSize,
+                                               commands, inboxes, reports))
+                 for index in range(workers)]
+    for process in processes:
+        process.start()
+
+    def report():
+        # A worker that dies would otherwise leave us waiting forever
+        while True:
+            try:
+                return reports.get(timeout=1)
+            except queue.Empty:
+                if not all(process.is_alive() for process in processes):
+                    raise RuntimeError("An HDA* worker stopped unexpectedly")
+
+    def ask(worker, command):
+        commands[worker].put(command)
+        return report()
+
+    try:
+        startOwner = owner(start, workers)
+        layer = heuristic(start, problem)
+        inboxes[startOwner].put([(layer, 0, start, None, None, 0)])
+        expected = [0] * workers
+        expected[startOwner] = 1
+        incumbent = INFINITY
+        goal = None
+        rounds = 0
+
+        while True:
+            rounds += 1
+            for index in range(workers):
+                commands[index].put(('round', layer, incumbent, expected[index]))
+            expected = [0] * workers
+            lowest = INFINITY
+            for _ in range(workers):
+                index, openMinF, sentMinF, sent, workerIncumbent, candidate = report()
+                for other, batches in enumerate(sent):
+                    expected[other] += batches
+                lowest = min(lowest, openMinF, sentMinF)
+                if workerIncumbent < incumbent:
+                    incumbent, goal = workerIncumbent, candidate
+            if lowest >= incumbent:
+                break
+            layer = lowest
+
+        # Deliver the last round's batches so every parent link is recorded
+        for index in range(workers):
+            commands[index].put(('drain', expected[index]))
+        for _ in range(workers):
+            report()
+
+        path = []
+        if goal is not None:
+            state = goal
+            while state != start:
+                _, state, action = ask(owner(state, workers), ('parent', state))
+                path.append(action)
+            path.reverse()
+
+        nodes_expanded = 0
+        max_depth = 0
+        workerStats = [None] * workers
+        for index in range(workers):
+            commands[index].put(('stop',))
+        for _ in range(workers):
+            index, counters, depth = report()
+            workerStats[index] = counters
+            nodes_expanded += counters['expanded']
+            max_depth = max(max_depth, depth)
+        if stats is not None:
+            stats['rounds'] = rounds
+            for index, counters in enumerate(workerStats):
+                stats['worker_%d' % index] = counters
+        return path, nodes_expanded, max_depth
+    finally:
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,125 @@
+# portfolio.py
+# ------------
+# Races several searches on one eight puzzle.
+
+
+"""
+Which search is fastest on a given instance is hard to tell in advance, so
+a portfolio runs several (search, heuristic) entries side by side, one
+process each, takes the first result that meets the caller's requirement
+and stops the others.
+
+With require='any' the first entry to finish wins.  With require='optimal'
+only entries whose first solution is guaranteed cost-optimal are raced:
+UCS, A*, IDA*, HDA* and BiA* with the admissible heuristics of this project,
+plus BFS, VecBFS, IDS, BiBFS and the distance oracle when every move costs 1.
+"""
+
+import multiprocessing
+import queue
+import time
+
+import eightpuzzle
+
+REQUIREMENTS = ('any', 'optimal')
+
+DEFAULT_ENTRIES = (('A*', 'manhattan'), ('IDA*', 'other'), ('BiBFS', None), ('GBS', 'manhattan'))
+
+# Searches whose first solution has the least cost, and those that only
+# find the fewest moves
+OPTIMAL_SEARCHES = ('UCS', 'A*', 'IDA*', 'HDA*', 'BiA*')
+UNIT_COST_OPTIMAL_SEARCHES = ('BFS', 'VecBFS', 'IDS', 'BiBFS', 'Oracle')
+
+def parseEntries(spec):
+    """
+    Parses a comma-separated list of search[:heuristic] entries.
+
+    >>> parseEntries('A*:manhattan, BiBFS')
+    [('A*', 'manhattan'), ('BiBFS', None)]
+    """
+    entries = []
+    for item in spec.split(','):
+        searchName, _, heuristicName = item.strip().partition(':')
+        if searchName not in eightpuzzle.SEARCHES:
+            raise ValueError("Unknown search '%s'" % searchName)
+        usesHeuristic = eightpuzzle.SEARCHES[searchName][1]
+        if usesHeuristic and heuristicName not in eightpuzzle.HEURISTICS:
+            raise ValueError("%s needs a heuristic from %s" % (searchName, ', '.join(eightpuzzle.HEURISTICS)))
+        entries.append((searchName, heuristicName if usesHeuristic else None))
+    return entries
+
+def entryName(entry):
+    "Returns a display name such as 'A* (manhattan)'."
+    searchName, heuristicName = entry
+    return '%s (%s)' % (searchName, heuristicName) if heuristicName else searchName
+
+def isOptimal(entry, tileCosts=None):
+    "Returns whether the entry's first solution is guaranteed to cost the least."
+    searchName = entry[0]
+    return searchName in OPTIMAL_SEARCHES or (tileCosts is None and searchName in UNIT_COST_OPTIMAL_SEARCHES)
+
+def _runEntry(results, index, problem, entry, normalize):
+    searchName, heuristicName = entry
+    searchFunction, usesHeuristic, takesOptions = eightpuzzle.SEARCHES[searchName]
+    heuristic = eightpuzzle.HEURISTICS[heuristicName] if usesHeuristic else None
+    try:
+        metrics = eightpuzzle.run_search(problem, searchFunction, searchName, problem.getStartState(),
+                                         heuristic, normalize, stats={}, verbose=False)
+    except Exception as error:
+        results.put((index, None, '%s: %s' % (type(error).__name__, error)))
+    else:
+        results.put((index, metrics, None))
+
+def race(problem, entries=DEFAULT_ENTRIES, require='any', normalize=False, timeout=None):
+    """
+    Runs each (search, heuristic) entry on 'problem' in its own process and
+    returns (entry, metrics, raceTime) for the first one to finish that
+    meets 'require'; the rest are terminated.  raceTime is the wall time
+    from the start of the race, including process start-up, while
+    metrics['time'] is the winner's own search time.  The tables the
+    entries need are loaded before the race starts (see
+    eightpuzzle.loadTables), so the racers share them.
+
+    An entry that fails is dropped from the race.  Raises RuntimeError if
+    every entry fails and TimeoutError if none finishes within 'timeout'
+    seconds.
+    """
+    if require not in REQUIREMENTS:
+        raise ValueError("Unknown requirement '%s'; choose from %s" % (require, ', '.join(REQUIREMENTS)))
+    entries = [tuple(entry) for entry in entries]
+    if require == 'optimal':
+        entries = [entry for entry in entries if isOptimal(entry, problem.tileCosts)]
+        if not entries:
+            raise ValueError("No entry of the portfolio is guaranteed to be optimal")
+
+    # Tables are loaded before the race, so the racers map them instead of
+    # each building the same ones
+    for searchName, heuristicName in entries:
+        eightpuzzle.loadTables(searchName, heuristicName, problem.goal, normalize)
+
+    start = time.time()
+    results = multiprocessing.Queue()
+    # Not daemons, so that entries such as HDA* can start processes of their own
+    racers = [multiprocessing.Process(target=_runEntry, args=(results, index, problem, entry, normalize))
+              for index, entry in enumerate(entries)]
+    for racer in racers:
+        racer.start()
+
+    errors = []
+    try:
+        while len(errors) < len(entries):
+            remaining = None if timeout is None else max(0, start + timeout - time.time())
+            try:
+                index, metrics, error = results.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError("No portfolio entry finished within %s seconds" % timeout)
+            if error is None:
+                return entries[index], metrics, time.time() - start
+            errors.append('%s: %s' % (entryName(entries[index]), error))
+        raise RuntimeError("Every portfolio entry failed: " + '; '.join(errors))
+    finally:
+        for racer in racers:
+            if racer.is_alive():
+                racer.terminate()
+        for racer in racers:
+            racer.join()
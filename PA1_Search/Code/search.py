@@ -18,6 +18,15 @@ Pacman agents (in searchAgents.py).
 """
 
 import util
+import patterndb
+import distancetable
+import vectorbfs
+from util import NodeStore
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 class SearchProblem:
     """
@@ -74,8 +83,27 @@ def tinyMazeSearch(problem):
 
 
 
+#Each search takes its frontier, by name (see util.FRONTIERS) or as a
+#util.Frontier, and an optional 'stats' dict that receives the frontier's
+#counters.  DFS and BFS push with priority -depth and depth, so priority
+#frontiers keep their order.  A* passes g for tie-breaking; GBS passes depth.
+#Any extra keyword counters are recorded alongside the frontier's.
+def _recordStats(stats, frontier, **counters):
+    if stats is not None:
+        stats.update(frontier.stats())
+        stats.update(counters)
+
+
+#With 'lazy' set, DFS and BFS expand through problem.iterSuccessors when the
+#problem has one, so children after an early goal are never built.
+def _successorFunction(problem, lazy):
+    if lazy:
+        return getattr(problem, 'iterSuccessors', problem.getSuccessors)
+    return problem.getSuccessors
+
+
 """First 4 search algorithms have similar structure but use different data structures for frontier"""
-def depthFirstSearch(problem: SearchProblem):
+def depthFirstSearch(problem: SearchProblem, frontier='lifo', stats=None, earlyGoal=False, lazy=False):
     """
     Search the deepest nodes in the search tree first.
 
@@ -88,21 +116,30 @@ def depthFirstSearch(problem: SearchProblem):
     print("Start:", problem.getStartState())
     print("Is the start a goal?", problem.isGoalState(problem.getStartState()))
     print("Start's successors:", problem.getSuccessors(problem.getStartState()))
+
+    earlyGoal tests each successor for the goal as it is generated instead
+    of when it is popped; lazy generates successors one at a time (see
+    _successorFunction).
     """
     "*** YOUR CODE HERE ***"
     
-    from util import Stack
-    
-    frontier = Stack()
+    frontier = util.makeFrontier(frontier)
     start_state = problem.getStartState()
-    frontier.push((start_state, [], 0))  # (state, path, depth)
+    frontier.push((start_state, NodeStore.ROOT, 0), 0)  # (state, node, depth)
     explored = set()
+    nodes = NodeStore()
+    successorsOf = _successorFunction(problem, lazy)
     
     nodes_expanded = 0
+    nodes_generated = 0
     max_depth = 0
     
+    if earlyGoal and problem.isGoalState(start_state):
+        _recordStats(stats, frontier, nodes_generated=nodes_generated)
+        return [], nodes_expanded, max_depth
+    
     while not frontier.isEmpty():
-        currentState, actions, depth = frontier.pop()
+        currentState, node, depth = frontier.pop()
         
         if currentState in explored:
             continue
@@ -111,34 +148,51 @@ def depthFirstSearch(problem: SearchProblem):
         nodes_expanded += 1
         max_depth = max(max_depth, depth)
         
-        if problem.isGoalState(currentState):
-            return actions, nodes_expanded, max_depth  # Found 
-        
-        successors = problem.getSuccessors(currentState)
+        if not earlyGoal and problem.isGoalState(currentState):
+            _recordStats(stats, frontier, nodes_generated=nodes_generated)
+            return nodes.path(node), nodes_expanded, max_depth  # Found 
         
-        for nextState, action, cost in successors:
+        for nextState, action, cost in successorsOf(currentState):
+            nodes_generated += 1
             if nextState not in explored:
-                newActions = actions + [action]
-                frontier.push((nextState, newActions, depth + 1))
+                child = nodes.add(node, action)
+                if earlyGoal and problem.isGoalState(nextState):
+                    _recordStats(stats, frontier, nodes_generated=nodes_generated)
+                    return nodes.path(child), nodes_expanded, max(max_depth, depth + 1)  # Found on generation
+                frontier.push((nextState, child, depth + 1), -depth - 1)
     
+    _recordStats(stats, frontier, nodes_generated=nodes_generated)
     return [], nodes_expanded, max_depth # No solution found
         
 
-def breadthFirstSearch(problem: SearchProblem):
-    """Search the shallowest nodes in the search tree first."""
+def breadthFirstSearch(problem: SearchProblem, frontier='fifo', stats=None, earlyGoal=False, lazy=False):
+    """
+    Search the shallowest nodes in the search tree first.
+
+    With earlyGoal set, successors are tested for the goal as they are
+    generated.  Every step costs the same, so the first goal generated is
+    as shallow as any, and the search stops before queuing the rest of
+    the goal's layer, which is the largest one.  lazy generates successors
+    one at a time (see _successorFunction).
+    """
     "*** YOUR CODE HERE ***"
-    from util import Queue
-    
-    frontier = Queue()
+    frontier = util.makeFrontier(frontier)
     start_state = problem.getStartState()
-    frontier.push((start_state, [], 0))  # (state, path, depth)
+    frontier.push((start_state, NodeStore.ROOT, 0), 0)  # (state, node, depth)
     explored = set()
+    nodes = NodeStore()
+    successorsOf = _successorFunction(problem, lazy)
     
     nodes_expanded = 0
+    nodes_generated = 0
     max_depth = 0
     
+    if earlyGoal and problem.isGoalState(start_state):
+        _recordStats(stats, frontier, nodes_generated=nodes_generated)
+        return [], nodes_expanded, max_depth
+    
     while not frontier.isEmpty():
-        currentState, actions, depth = frontier.pop()
+        currentState, node, depth = frontier.pop()
         
         if currentState in explored:
             continue
@@ -147,120 +201,174 @@ def breadthFirstSearch(problem: SearchProblem):
         nodes_expanded += 1
         max_depth = max(max_depth, depth)
         
-        if problem.isGoalState(currentState):
-            return actions, nodes_expanded, max_depth  # Found 
-        
-        successors = problem.getSuccessors(currentState)
+        if not earlyGoal and problem.isGoalState(currentState):
+            _recordStats(stats, frontier, nodes_generated=nodes_generated)
+            return nodes.path(node), nodes_expanded, max_depth  # Found 
         
-        for nextState, action, cost in successors:
+        for nextState, action, cost in successorsOf(currentState):
+            nodes_generated += 1
             if nextState not in explored:
-                newActions = actions + [action]
-                frontier.push((nextState, newActions, depth + 1))
-    
+                child = nodes.add(node, action)
+                if earlyGoal and problem.isGoalState(nextState):
+                    _recordStats(stats, frontier, nodes_generated=nodes_generated)
+                    return nodes.path(child), nodes_expanded, max(max_depth, depth + 1)  # Found on generation
+                frontier.push((nextState, child, depth + 1), depth + 1)
     
+    _recordStats(stats, frontier, nodes_generated=nodes_generated)
+    return [], nodes_expanded, max_depth # No solution found
+
 
 #explained by https://github.com/mgabilo/eightpuzzle-iterative-deepening
 
-def iterativeDeepeningSearch(problem: SearchProblem):
-    
-    from util import Stack
-    
+def iterativeDeepeningSearch(problem: SearchProblem, stats=None, maxTableSize=None):
+    """
+    Runs depthLimitedDFS with limits 0, 1, 2, ... until a limit is reached
+    with no cutoff.  The first solution found is a shallowest one.
+
+    All iterations share one transposition table holding the shallowest
+    depth at which each state has been seen, so a state reached deeper than
+    that is pruned even on the first visit of a new iteration.
+    maxTableSize caps the table; states beyond it are simply not recorded.
+
+    If 'stats' is a dict, stats['nodes_per_depth'] receives the number of
+    nodes visited at each depth, one list per iteration.
+    """
+    table = {}
     total_nodes_expanded = 0
+    nodes_per_depth = []
     depth_limit = 0
     
     while True:
         # Do depth-limited DFS
-        result, nodes_expanded = depthLimitedDFS(problem, depth_limit)
+        result, nodes_expanded, per_depth = depthLimitedDFS(problem, depth_limit, table, maxTableSize)
         total_nodes_expanded += nodes_expanded
+        nodes_per_depth.append(per_depth)
         
         if result != 'cutoff':
-            return result, total_nodes_expanded, depth_limit
+            break
         
         # Otherwise, increase depth limit and try again
         depth_limit += 1
+
+    if stats is not None:
+        stats['nodes_per_depth'] = nodes_per_depth
+        stats['table_size'] = len(table)
+    return result, total_nodes_expanded, depth_limit
     
 
 
-def depthLimitedDFS(problem: SearchProblem, limit):
+def depthLimitedDFS(problem: SearchProblem, limit, table=None, maxTableSize=None):
+    """
+    Depth-first search down to depth 'limit'.  The stack holds one frame
+    per level (the remaining successors of the state at that level), so
+    apart from the table memory is O(limit) and the path is the list of
+    actions along the stack.
+
+    table maps each state to (shallowest depth seen, limit of the iteration
+    that saw it).  A state is skipped if it was seen shallower, or at the
+    same depth during this iteration; deeper entries are overwritten.  Pass
+    the same table to successive calls with growing limits.
+
+    Returns (actions or 'cutoff' or [], nodes visited, visits per depth).
+    """
     #utility for IDS
-    from util import Stack   
-     
-    frontier = Stack()
-    start_state = problem.getStartState()
-    frontier.push((start_state, [], 0))  # (state, actions, depth)
-    explored = set()
-    
-    nodes_expanded = 0
+    if table is None:
+        table = {}
+    nodes_expanded = 1
+    nodes_per_depth = [0] * (limit + 1)
+    nodes_per_depth[0] = 1
     cutoff_occurred = False
+
+    start_state = problem.getStartState()
+    table[start_state] = (0, limit)
+    if problem.isGoalState(start_state):
+        return [], nodes_expanded, nodes_per_depth
+    if limit == 0:
+        return 'cutoff', nodes_expanded, nodes_per_depth
+
+    actions = []
+    # Successors are tried last-first, as when they were pushed on a Stack
+    stack = [reversed(problem.getSuccessors(start_state))]
     
-    while not frontier.isEmpty():
-        currentState, actions, depth = frontier.pop()
-        
-        # Skip if already visited at this or shallower depth
-        if currentState in explored:
-            continue
-        
-        explored.add(currentState)
-        nodes_expanded += 1
-        
-        # Goal test
-        if problem.isGoalState(currentState):
-            return actions, nodes_expanded
-        
-        if depth < limit:
-            successors = problem.getSuccessors(currentState)
-            
-            for nextState, action, cost in successors:
-                if nextState not in explored:
-                    newActions = actions + [action]
-                    frontier.push((nextState, newActions, depth + 1))
-        else:
+    while stack:
+        depth = len(stack) # depth of the successors in the top frame
+        for nextState, action, cost in stack[-1]:
+            # Skip if already visited at a shallower depth, or at this depth
+            # during this iteration
+            seen = table.get(nextState)
+            if seen is not None and (seen[0] < depth or seen == (depth, limit)):
+                continue
+            if seen is not None or maxTableSize is None or len(table) < maxTableSize:
+                table[nextState] = (depth, limit)
+
+            nodes_expanded += 1
+            nodes_per_depth[depth] += 1
+            actions.append(action)
+
+            # Goal test
+            if problem.isGoalState(nextState):
+                return actions, nodes_expanded, nodes_per_depth
+
+            if depth < limit:
+                stack.append(reversed(problem.getSuccessors(nextState)))
+                break
             # Hit the depth limit - this path is cut off
             cutoff_occurred = True
+            actions.pop()
+        else:
+            # Every successor in this frame is done; back up one level
+            stack.pop()
+            if actions:
+                actions.pop()
     
     # If we cut off any paths, signal that we should try deeper
     if cutoff_occurred:
-        return 'cutoff', nodes_expanded
+        return 'cutoff', nodes_expanded, nodes_per_depth
     else:
-        return [], nodes_expanded  # No solution 
+        return [], nodes_expanded, nodes_per_depth  # No solution 
 
 
-#uses function getcostofactions from eightpuzzle
-def uniformCostSearch(problem: SearchProblem):
+#path cost is carried in the node and grown by each successor's stepCost
+def uniformCostSearch(problem: SearchProblem, frontier='heap', stats=None):
     """Search the node of least total cost first."""
     "*** YOUR CODE HERE ***"
-    from util import PriorityQueue
-    
-    frontier = PriorityQueue()
+    frontier = util.makeFrontier(frontier)
     start_state = problem.getStartState()
-    frontier.push((start_state, [], 0), 0)  # ((state, actions, depth), priority=cost)
-    explored = set()
+    frontier.push((start_state, NodeStore.ROOT, 0, 0), 0)  # ((state, node, depth, cost), priority=cost)
+    bestCost = {start_state: 0}  # cheapest cost queued so far for each state
+    nodes = NodeStore()
     
     nodes_expanded = 0
     max_depth = 0
+    pruned = 0
     
     while not frontier.isEmpty():
-        currentState, actions, depth = frontier.pop()
+        currentState, node, depth, cost = frontier.pop()
         
-        if currentState in explored:
+        # A cheaper entry for this state was queued after this one
+        if cost > bestCost[currentState]:
             continue
         
-        explored.add(currentState)
         nodes_expanded += 1
         max_depth = max(max_depth, depth)
         
         if problem.isGoalState(currentState):
-            return actions, nodes_expanded, max_depth
+            _recordStats(stats, frontier, duplicates_pruned=pruned)
+            return nodes.path(node), nodes_expanded, max_depth
         
         # Expand successors
         successors = problem.getSuccessors(currentState)
         
         for nextState, action, stepCost in successors:
-            if nextState not in explored:
-                newActions = actions + [action]
-                newCost = problem.getCostOfActions(newActions)
-                frontier.push((nextState, newActions, depth + 1), newCost)
+            newCost = cost + stepCost
+            # No cheaper than what is already queued or expanded: drop it
+            if newCost >= bestCost.get(nextState, newCost + 1):
+                pruned += 1
+                continue
+            bestCost[nextState] = newCost
+            frontier.push((nextState, nodes.add(node, action), depth + 1, newCost), newCost, newCost)
     
+    _recordStats(stats, frontier, duplicates_pruned=pruned)
     return [], nodes_expanded, max_depth
 
 def nullHeuristic(state, problem=None):
@@ -271,110 +379,619 @@ def nullHeuristic(state, problem=None):
     return 0
 
 #Heuristic Functions:
+
+#Sliding puzzle heuristics read the packed board of a state (see
+#EightPuzzleState and slidingpuzzle.py), whose class gives the board's
+#'size' and 'bits' per cell, and look tiles up in tables built once per
+#goal board.
+class HeuristicTables:
+    """
+    Per-goal lookup tables for the sliding puzzle heuristics.  Both tables
+    are indexed by tile * cells + cell, where cells = size * size:
+
+      manhattan - Manhattan distance of 'tile' at 'cell' from its goal cell
+      misplaced - 1 if 'tile' at 'cell' is out of place, else 0
+
+    The blank (tile 0) is never counted.
+    """
+    def __init__(self, goalBoard, size=3, bits=4):
+        cells = size * size
+        mask = (1 << bits) - 1
+        goalCell = [0] * cells
+        for cell in range(cells):
+            goalCell[(goalBoard >> (cell * bits)) & mask] = cell
+        manhattan = []
+        misplaced = []
+        for tile in range(cells):
+            goalRow, goalCol = divmod(goalCell[tile], size)
+            for cell in range(cells):
+                row, col = divmod(cell, size)
+                if tile == 0:
+                    manhattan.append(0)
+                    misplaced.append(0)
+                else:
+                    manhattan.append(abs(row - goalRow) + abs(col - goalCol))
+                    misplaced.append(int(cell != goalCell[tile]))
+        self.cells = cells
+        self.bits = bits
+        self.mask = mask
+        self.goalCell = tuple(goalCell)
+        self.manhattan = bytes(manhattan)
+        self.misplaced = bytes(misplaced)
+
+_heuristicTables = {}
+
+def heuristicTables(problem):
+    "Returns the HeuristicTables for problem.goal, building them on first use."
+    #Boards of different sizes never pack to the same integer, so the board
+    #alone is the key
+    goal = problem.goal
+    tables = _heuristicTables.get(goal.board)
+    if tables is None:
+        tables = _heuristicTables[goal.board] = HeuristicTables(goal.board, goal.size, goal.bits)
+    return tables
+
+def _sumTable(tables, table, board):
+    cells, bits, mask = tables.cells, tables.bits, tables.mask
+    total = 0
+    for cell in range(cells):
+        total += table[((board >> (cell * bits)) & mask) * cells + cell]
+    return total
+
 def misplacedTilesHeuristic(state, problem):
     """Heuristic based on number of misplaced tiles."""
-    goal = problem.goal
-    misplaced = 0
-    for row in range(3):
-        for col in range(3):
-            if state.cells[row][col] != 0 and state.cells[row][col] != goal.cells[row][col]:
-                misplaced += 1
-    return misplaced
+    tables = heuristicTables(problem)
+    return _sumTable(tables, tables.misplaced, state.board)
 
 def manhattanDistanceHeuristic(state, problem):
     """Heuristic based on sum of Manhattan distances of tiles from their goal positions."""
-    distance = 0
-    goal_state = problem.goal
-    for row in range(3):
-        for col in range(3):
-            title = state.cells[row][col]
-            if title != 0:
-                for goal_row in range(3):
-                    for goal_col in range(3):
-                        if goal_state.cells[goal_row][goal_col] == title:
-                            distance += abs(row - goal_row) + abs(col - goal_col)
-    return distance
-
-
-
-def aStarSearch(problem: SearchProblem, heuristic=nullHeuristic):
-    """Search the node that has the lowest combined cost and heuristic first."""
+    tables = heuristicTables(problem)
+    return _sumTable(tables, tables.manhattan, state.board)
+
+def patternDatabaseHeuristic(state, problem):
+    """Additive disjoint pattern database heuristic (see patterndb.py)."""
+    return patterndb.patternDatabase(problem.goal.board).value(state.board)
+
+def exactDistanceHeuristic(state, problem):
+    """Perfect heuristic: the exact move count from a distance table (see distancetable.py)."""
+    return distancetable.distanceTable(problem.goal.board).distance(state.board)
+
+#Incremental updates: when 'tile' slides from cell 'source' to cell 'target',
+#h changes by delta(problem, tile, source, target).  Searches pass the
+#parent's h through the node and use childHeuristic below.
+def _misplacedDelta(problem, tile, source, target):
+    tables = heuristicTables(problem)
+    row = tile * tables.cells
+    return tables.misplaced[row + target] - tables.misplaced[row + source]
+
+def _manhattanDelta(problem, tile, source, target):
+    tables = heuristicTables(problem)
+    row = tile * tables.cells
+    return tables.manhattan[row + target] - tables.manhattan[row + source]
+
+misplacedTilesHeuristic.delta = _misplacedDelta
+manhattanDistanceHeuristic.delta = _manhattanDelta
+
+#Batch evaluation: heuristic.batch(cells, problem) scores an (N, cells)
+#NumPy array of boards, one row of tile numbers per board (0 for the blank),
+#with table lookups over the whole array at once.  Call it through
+#batchHeuristic below.  The pattern database and the exact distance table
+#only exist for the eight puzzle.
+def _tableBatch(table, cells):
+    width = cells.shape[1]
+    table = np.frombuffer(table, dtype=np.uint8).reshape(width, width)
+    return table[cells, np.arange(width)].sum(axis=1, dtype=np.int64)
+
+def _misplacedBatch(cells, problem):
+    return _tableBatch(heuristicTables(problem).misplaced, cells)
+
+def _manhattanBatch(cells, problem):
+    return _tableBatch(heuristicTables(problem).manhattan, cells)
+
+def _patternDatabaseBatch(cells, problem):
+    database = patterndb.patternDatabase(problem.goal.board)
+    data = np.frombuffer(database.data, dtype=np.uint8)
+    cellOf = np.argsort(cells, axis=1)
+    total = np.zeros(len(cells), dtype=np.int64)
+    for tiles, offset in database.groups:
+        index = np.full(len(cells), offset, dtype=np.int64)
+        for position, tile in enumerate(tiles):
+            index += cellOf[:, tile] * 9 ** (len(tiles) - 1 - position)
+        total += data[index]
+    return total
+
+def _exactBatch(cells, problem):
+    data = np.frombuffer(distancetable.distanceTable(problem.goal.board).data, dtype=np.uint8)
+    return data[vectorbfs.rankBoards(vectorbfs.packBoards(cells))].astype(np.int64)
+
+misplacedTilesHeuristic.batch = _misplacedBatch
+manhattanDistanceHeuristic.batch = _manhattanBatch
+patternDatabaseHeuristic.batch = _patternDatabaseBatch
+exactDistanceHeuristic.batch = _exactBatch
+
+def batchHeuristic(heuristic, cells, problem):
+    """
+    Returns a NumPy array with the heuristic value of each row of 'cells',
+    an (N, cells) array of boards as above (vectorbfs.unpackBoards turns
+    packed boards into one).  Heuristics without a batch function are called once
+    per board.  Needs NumPy.
+    """
+    if np is None:
+        raise ImportError("batchHeuristic needs NumPy (pip install numpy)")
+    cells = np.asarray(cells, dtype=np.intp).reshape(-1, problem.goal.size ** 2)
+    batch = getattr(heuristic, 'batch', None)
+    if batch is not None:
+        return batch(cells, problem)
+    stateClass = type(problem.goal)
+    return np.array([heuristic(stateClass(row), problem) for row in cells.tolist()], dtype=np.int64)
+
+def _scoreChildren(heuristic, delta, parentH, parent, children, problem, batched):
+    #The children's h values, from one batchHeuristic call if 'batched'
+    if not batched:
+        return [childHeuristic(heuristic, delta, parentH, parent, child, problem) for child in children]
+    if not children:
+        return []
+    cells = vectorbfs.unpackBoards([child.board for child in children], parent.size ** 2, parent.bits)
+    return batchHeuristic(heuristic, cells, problem).tolist()
+
+def childHeuristic(heuristic, delta, parentH, parent, child, problem):
+    """
+    Returns h(child) for a successor of 'parent'.  With a delta (see above)
+    this is O(1): the tile that slid went from child's blank cell to
+    parent's blank cell.  Otherwise the heuristic is evaluated in full.
+    """
+    if delta is None:
+        return heuristic(child, problem)
+    tile = (child.board >> (parent.blank * parent.bits)) & parent.mask
+    return parentH + delta(problem, tile, child.blank, parent.blank)
+
+
+
+def aStarSearch(problem: SearchProblem, heuristic=nullHeuristic, frontier='heap', stats=None, batched=False):
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+    With 'batched' the children of each expansion are scored together by
+    batchHeuristic.
+    """
     "*** YOUR CODE HERE ***"
-    from util import PriorityQueue
-    frontier = PriorityQueue()
+    frontier = util.makeFrontier(frontier)
     start_state = problem.getStartState()
     start_heuristic = heuristic(start_state, problem)
-    frontier.push((start_state, [], 0), start_heuristic)  
+    delta = getattr(heuristic, 'delta', None)
+    frontier.push((start_state, NodeStore.ROOT, 0, 0, start_heuristic), start_heuristic)  
+    bestCost = {start_state: 0}  # cheapest g queued so far for each state
     explored = set()
+    nodes = NodeStore()
 
     nodes_expanded = 0
     max_depth = 0
+    pruned = 0
+    reopened = 0
 
     while not frontier.isEmpty():
-        currentState, actions, depth = frontier.pop()
+        currentState, node, depth, cost, h = frontier.pop()
 
-        if currentState in explored:
+        # A cheaper entry for this state was queued after this one
+        if cost > bestCost[currentState]:
             continue
 
-        explored.add(currentState)
+        # With an inconsistent heuristic a closed state can be reached again
+        # more cheaply; it is then expanded again
+        if currentState in explored:
+            reopened += 1
+        else:
+            explored.add(currentState)
         nodes_expanded += 1
         max_depth = max(max_depth, depth)
 
         if problem.isGoalState(currentState):
-            return actions, nodes_expanded, max_depth
+            _recordStats(stats, frontier, duplicates_pruned=pruned, reopened=reopened)
+            return nodes.path(node), nodes_expanded, max_depth
 
         successors = problem.getSuccessors(currentState)
 
+        children = []
         for nextState, action, stepCost in successors:
-            if nextState not in explored:
-                newActions = actions + [action]
-                actual_cost = problem.getCostOfActions(newActions)
-                next_heuristic = heuristic(nextState, problem)
-                priority = actual_cost + next_heuristic
-                frontier.push((nextState, newActions, depth + 1), priority)
+            actual_cost = cost + stepCost
+            # No cheaper than what is already queued or expanded: drop it
+            if actual_cost >= bestCost.get(nextState, actual_cost + 1):
+                pruned += 1
+                continue
+            bestCost[nextState] = actual_cost
+            children.append((nextState, action, actual_cost))
+
+        childStates = [child[0] for child in children]
+        heuristics = _scoreChildren(heuristic, delta, h, currentState, childStates, problem, batched)
+        for (nextState, action, actual_cost), next_heuristic in zip(children, heuristics):
+            priority = actual_cost + next_heuristic
+            frontier.push((nextState, nodes.add(node, action), depth + 1, actual_cost, next_heuristic), priority, actual_cost)
+            
+    _recordStats(stats, frontier, duplicates_pruned=pruned, reopened=reopened)
             
     return [], nodes_expanded, max_depth
 
-def greedyBestFirstSearch(problem: SearchProblem, heuristic=nullHeuristic):
-    """Search the node that has the lowest heuristic value first."""
+def greedyBestFirstSearch(problem: SearchProblem, heuristic=nullHeuristic, frontier='heap', stats=None, batched=False):
+    """
+    Search the node that has the lowest heuristic value first.  With
+    'batched' the children of each expansion are scored together by
+    batchHeuristic.
+    """
     "*** YOUR CODE HERE ***"
-    from util import PriorityQueue
-    frontier = PriorityQueue()
+    frontier = util.makeFrontier(frontier)
     start_state = problem.getStartState()
     start_heuristic = heuristic(start_state, problem)
-    frontier.push((start_state, [], 0), start_heuristic)  
-    explored = set()
+    delta = getattr(heuristic, 'delta', None)
+    frontier.push((start_state, NodeStore.ROOT, 0, start_heuristic), start_heuristic)  
+    #GBS orders by h alone, so a second copy of a state can never come out
+    #ahead of the first: every state is queued at most once
+    queued = {start_state}
+    nodes = NodeStore()
 
     nodes_expanded = 0
     max_depth = 0
+    pruned = 0
 
     while not frontier.isEmpty():
-        currentState, actions, depth = frontier.pop()
+        currentState, node, depth, h = frontier.pop()
 
-        if currentState in explored:
-            continue
-
-        explored.add(currentState)
         nodes_expanded += 1
         max_depth = max(max_depth, depth)
 
         if problem.isGoalState(currentState):
-            return actions, nodes_expanded, max_depth
+            _recordStats(stats, frontier, duplicates_pruned=pruned)
+            return nodes.path(node), nodes_expanded, max_depth
 
         successors = problem.getSuccessors(currentState)
 
+        children = []
         for nextState, action, stepCost in successors:
-            if nextState not in explored:
-                newActions = actions + [action]
-                next_heuristic = heuristic(nextState, problem)
-                priority = next_heuristic
-                frontier.push((nextState, newActions, depth + 1), priority)
+            if nextState in queued:
+                pruned += 1
+                continue
+            queued.add(nextState)
+            children.append((nextState, action))
+
+        childStates = [child[0] for child in children]
+        heuristics = _scoreChildren(heuristic, delta, h, currentState, childStates, problem, batched)
+        for (nextState, action), next_heuristic in zip(children, heuristics):
+            priority = next_heuristic
+            # f is h alone, so g is 0 for the two-level frontier's tie-breaking
+            frontier.push((nextState, nodes.add(node, action), depth + 1, next_heuristic), priority, 0)
+            
+    _recordStats(stats, frontier, duplicates_pruned=pruned)
             
     return [], nodes_expanded, max_depth
 
 
+#Bidirectional searches need a problem that also provides getGoalState()
+#and getPredecessors(state), the (predecessor, action, stepCost) triples
+#whose action leads to 'state'.  Bidirectional A* also needs reverse(), the
+#problem from the goal back to the start, to evaluate backward heuristics.
+
+def _joinPaths(meet, forwardParents, backwardParents):
+    """
+    Returns the actions from the start to 'meet' (following forwardParents,
+    state -> (parent, action)) and on to the goal (following
+    backwardParents, state -> (next state, action)).
+    """
+    actions = []
+    state = meet
+    while forwardParents[state][0] is not None:
+        state, action = forwardParents[state]
+        actions.append(action)
+    actions.reverse()
+    state = meet
+    while backwardParents[state][0] is not None:
+        action = backwardParents[state][1]
+        state = backwardParents[state][0]
+        actions.append(action)
+    return actions
+
+def bidirectionalBreadthFirstSearch(problem: SearchProblem, stats=None):
+    """
+    Breadth-first search from the start and from the goal at once, one
+    whole layer at a time, always growing the side with the smaller layer.
+    It stops at the first state generated by one side that the other side
+    has already reached: with unit costs that meeting lies on a shortest
+    path.  Returns max_depth as the deeper of the two searches.
+    """
+    start_state = problem.getStartState()
+    goal_state = problem.getGoalState()
+    forwardParents = {start_state: (None, None)}
+    backwardParents = {goal_state: (None, None)}
+    forwardLayer = [start_state]
+    backwardLayer = [goal_state]
+    depths = [0, 0]
+    expanded = [0, 0]
+
+    meet = start_state if problem.isGoalState(start_state) else None
+    while meet is None and forwardLayer and backwardLayer:
+        if len(forwardLayer) <= len(backwardLayer):
+            side, layer, parents, others = 0, forwardLayer, forwardParents, backwardParents
+            neighbours = problem.getSuccessors
+        else:
+            side, layer, parents, others = 1, backwardLayer, backwardParents, forwardParents
+            neighbours = problem.getPredecessors
+
+        nextLayer = []
+        for state in layer:
+            expanded[side] += 1
+            for nextState, action, cost in neighbours(state):
+                if nextState in parents:
+                    continue
+                parents[nextState] = (state, action)
+                if nextState in others:
+                    meet = nextState
+                    break
+                nextLayer.append(nextState)
+            if meet is not None:
+                break
+        depths[side] += 1
+        if side == 0:
+            forwardLayer = nextLayer
+        else:
+            backwardLayer = nextLayer
+
+    if stats is not None:
+        stats['forward_expanded'], stats['backward_expanded'] = expanded
+        stats['forward_depth'], stats['backward_depth'] = depths
+    if meet is None:
+        return [], sum(expanded), max(depths) # No solution found
+    return _joinPaths(meet, forwardParents, backwardParents), sum(expanded), max(depths)
+
+def _canonicalHeuristic(heuristic, problem):
+    """
+    Returns (heuristic, problem) evaluating 'heuristic' against the
+    canonicalForm() of 'problem' when it has one, so that per-goal tables
+    are built for one of a few canonical goals rather than for every goal.
+    A delta is carried over by mapping the tile and cells it is given.
+    """
+    canonicalForm = getattr(problem, 'canonicalForm', None)
+    if canonicalForm is None:
+        return heuristic, problem
+    canonical, transform, cellMap, relabel, _ = canonicalForm()
+
+    def canonicalHeuristic(state, problem):
+        return heuristic(transform(state), problem)
+
+    delta = getattr(heuristic, 'delta', None)
+    if delta is not None:
+        def canonicalDelta(problem, tile, source, target):
+            return delta(problem, relabel[tile], cellMap[source], cellMap[target])
+        canonicalHeuristic.delta = canonicalDelta
+    return canonicalHeuristic, canonical
+
+def bidirectionalAStarSearch(problem: SearchProblem, heuristic=nullHeuristic, stats=None):
+    """
+    Front-to-end bidirectional A*.  A forward A* from the start and a
+    backward A* from the goal (whose heuristic is evaluated against
+    problem.reverse(), i.e. it estimates the cost from the start, through
+    _canonicalHeuristic) run in turn, the side with fewer open nodes going
+    next.  Each generated state already reached by the other side gives a
+    candidate path; the search stops once the cheapest candidate costs no
+    more than the larger of the two smallest open f-values, which no
+    unexplored path can beat when the heuristic is admissible.  States are
+    reopened when reached more cheaply, so the heuristic need not be
+    consistent (the pattern database is not).
+    """
+    import heapq
+
+    start_state = problem.getStartState()
+    goal_state = problem.getGoalState()
+    if problem.isGoalState(start_state):
+        return [], 0, 0
+    backwardHeuristic, reverse = _canonicalHeuristic(heuristic, problem.reverse())
+
+    # Per side: open heap of (f, tie, g, h, depth, state), best g, parents
+    sides = []
+    for state, target, sideHeuristic, neighbours in (
+            (start_state, problem, heuristic, problem.getSuccessors),
+            (goal_state, reverse, backwardHeuristic, problem.getPredecessors)):
+        h = sideHeuristic(state, target)
+        sides.append({'open': [(h, 0, 0, h, 0, state)], 'g': {state: 0},
+                      'parents': {state: (None, None)}, 'closed': set(),
+                      'target': target, 'heuristic': sideHeuristic,
+                      'delta': getattr(sideHeuristic, 'delta', None), 'neighbours': neighbours,
+                      'expanded': 0, 'depth': 0})
+    forward, backward = sides
+    best = float('inf')
+    meet = None
+    count = 1
+
+    def topF(side):
+        "Drops stale entries and returns the smallest open f (inf if none)."
+        heap = side['open']
+        while heap and (heap[0][5] in side['closed'] or heap[0][2] > side['g'][heap[0][5]]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else float('inf')
+
+    while True:
+        forwardF, backwardF = topF(forward), topF(backward)
+        if best <= max(forwardF, backwardF):
+            break
+        side = forward if len(forward['open']) <= len(backward['open']) else backward
+        if not side['open']:
+            side = backward if side is forward else forward
+        other = backward if side is forward else forward
+
+        f, _, g, h, depth, state = heapq.heappop(side['open'])
+        side['closed'].add(state)
+        side['expanded'] += 1
+        side['depth'] = max(side['depth'], depth)
+
+        for nextState, action, stepCost in side['neighbours'](state):
+            nextG = g + stepCost
+            if nextG >= side['g'].get(nextState, float('inf')):
+                continue
+            side['g'][nextState] = nextG
+            side['parents'][nextState] = (state, action)
+            side['closed'].discard(nextState)
+            nextH = childHeuristic(side['heuristic'], side['delta'], h, state, nextState, side['target'])
+            heapq.heappush(side['open'], (nextG + nextH, count, nextG, nextH, depth + 1, nextState))
+            count += 1
+            if nextState in other['g'] and nextG + other['g'][nextState] < best:
+                best = nextG + other['g'][nextState]
+                meet = nextState
+
+    nodes_expanded = forward['expanded'] + backward['expanded']
+    max_depth = max(forward['depth'], backward['depth'])
+    if stats is not None:
+        stats['forward_expanded'] = forward['expanded']
+        stats['backward_expanded'] = backward['expanded']
+    if meet is None:
+        return [], nodes_expanded, max_depth # No solution found
+    return _joinPaths(meet, forward['parents'], backward['parents']), nodes_expanded, max_depth
+
+
+def _boardParity(cells, width):
+    """
+    Returns the parity of a board that every move preserves: each move swaps
+    two cells (flipping the permutation parity) and moves the blank by one
+    cell (flipping the parity of its row + column).  A goal is reachable
+    only from boards of the same parity.
+    """
+    parity = 0
+    seen = [False] * len(cells)
+    for cell in range(len(cells)):
+        # Each cycle of length k is k - 1 transpositions
+        length = 0
+        while not seen[cell]:
+            seen[cell] = True
+            cell = cells[cell]
+            length += 1
+        if length:
+            parity ^= (length - 1) & 1
+    row, col = divmod(cells.index(0), width)
+    return parity ^ ((row + col) & 1)
+
+def idaStarSearch(problem: SearchProblem, heuristic=nullHeuristic, stats=None):
+    """
+    Iterative-deepening A*: depth-first searches bounded by f = g + h, each
+    bound being the smallest f that exceeded the previous one.  Optimal for
+    admissible heuristics, and memory is O(solution depth).
+
+    Works on sliding puzzle problems directly: a single list of cells is
+    updated in place by applying and undoing moves, the move that would
+    undo the previous one is never tried, and heuristics with a delta (see
+    childHeuristic) are updated without building any states.  Others are
+    evaluated on a state built from the board.
+
+    If 'stats' is a dict, stats['iterations'] receives one (bound, nodes
+    expanded) pair per iteration.
+    """
+    start = problem.getStartState()
+    goal = problem.goal
+    neighbours = start.neighbours
+    tileCosts = getattr(problem, 'tileCosts', None)
+    delta = getattr(heuristic, 'delta', None)
+    stateClass = type(start)
+    size, bits, mask = start.size, start.bits, start.mask
+    cellCount = size * size
+
+    cells = bytearray((start.board >> (cell * bits)) & mask for cell in range(cellCount))
+    goalCells = bytearray((goal.board >> (cell * bits)) & mask for cell in range(cellCount))
+    if _boardParity(cells, size) != _boardParity(goalCells, size):
+        if stats is not None:
+            stats['iterations'] = []
+        return [], 0, 0 # Goal is unreachable
+
+    path = []
+    iterations = []
+    nodes_expanded = 0
+    max_depth = 0
+    FOUND = -1
+
+    def boundedSearch(blank, previous, cost, h, bound):
+        nonlocal nodes_expanded, max_depth
+        f = cost + h
+        if f > bound:
+            return f
+        if len(path) > max_depth:
+            max_depth = len(path)
+        if cells == goalCells:
+            return FOUND
+        nodes_expanded += 1
+
+        minimum = float('inf')
+        for action, target in neighbours[blank]:
+            if target == previous:
+                continue
+            # Apply: slide the tile at 'target' into the blank
+            tile = cells[target]
+            cells[blank] = tile
+            cells[target] = 0
+            if delta is not None:
+                nextH = h + delta(problem, tile, target, blank)
+            else:
+                board = 0
+                for cell in range(cellCount):
+                    board |= cells[cell] << (cell * bits)
+                nextH = heuristic(stateClass.fromBoard(board, target), problem)
+            stepCost = 1 if tileCosts is None else tileCosts[tile]
+
+            path.append(action)
+            result = boundedSearch(target, blank, cost + stepCost, nextH, bound)
+            if result == FOUND:
+                return FOUND
+            path.pop()
+
+            # Undo
+            cells[target] = tile
+            cells[blank] = 0
+            if result < minimum:
+                minimum = result
+        return minimum
+
+    startH = heuristic(start, problem)
+    bound = startH
+    while True:
+        before = nodes_expanded
+        result = boundedSearch(start.blank, -1, 0, startH, bound)
+        iterations.append((bound, nodes_expanded - before))
+        if result == FOUND or result == float('inf'):
+            break
+        bound = result
+
+    if stats is not None:
+        stats['iterations'] = iterations
+    return path, nodes_expanded, max_depth
+
+
+def distanceOracleSearch(problem: SearchProblem, stats=None):
+    """
+    Solves an eight puzzle problem from its exact distance table: from each
+    state, step to a successor exactly one move closer to the goal.  This
+    costs O(depth) once the table exists, and the path has the fewest moves
+    (it is cost-optimal only when every move costs 1).
+    """
+    table = distancetable.distanceTable(problem.goal.board)
+    state = problem.getStartState()
+    distance = table.distance(state.board)
+    lookups = 1
+    if distance == distancetable.UNREACHED:
+        if stats is not None:
+            stats['table_lookups'] = lookups
+        return [], 0, 0 # Goal has the other parity
+
+    path = []
+    nodes_expanded = 0
+    while distance:
+        nodes_expanded += 1
+        for nextState, action, stepCost in problem.getSuccessors(state):
+            lookups += 1
+            if table.distance(nextState.board) == distance - 1:
+                break
+        path.append(action)
+        state = nextState
+        distance -= 1
+    if stats is not None:
+        stats['table_lookups'] = lookups
+    return path, nodes_expanded, len(path)
+
+
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
+idastar = idaStarSearch
 ucs = uniformCostSearch
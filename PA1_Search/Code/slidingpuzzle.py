@@ -0,0 +1,277 @@
+# slidingpuzzle.py
+# ----------------
+# Sliding puzzles of any size: the 8-, 15- and 24-puzzle.
+
+
+"""
+The states and search problem here work like EightPuzzleState and
+EightPuzzleSearchProblem in eightpuzzle.py, on an n x n board.  A board is
+packed into one integer with cell (row, col) at index n * row + col, four
+bits per cell while the tiles fit (n <= 4) and five bits for the
+24-puzzle.  Each size has its own state class (see STATE_CLASSES) holding
+the move tables for that size, so a state is still just a packed board and
+the index of its blank.  The 3x3 class is EightPuzzleState itself.
+
+The misplaced and manhattan heuristics in search.py, and the searches that
+work on the packed board such as IDA*, read the board layout from the
+state class.  IDA* is the search to use on 15-puzzles and larger: its
+memory grows only with the depth of the solution.
+"""
+
+import random
+
+import eightpuzzle
+import search
+import util
+
+class SlidingPuzzleState:
+    """
+    A sliding puzzle board.  Each subclass sets 'size' and gets the rest of
+    its board layout from it:
+
+      cellCount  - the number of cells, size * size
+      bits, mask - the bits per cell of the packed board, and their mask
+      neighbours - neighbours[blank] holds (move, target) for each legal move
+      swaps      - swaps[blank] holds (move, target, blankShift, targetShift)
+      goalBoard  - the packed board 0, 1, ..., cellCount - 1
+    """
+    __slots__ = ('board', 'blank')
+
+    size = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cells = cls.size * cls.size
+        cls.cellCount = cells
+        cls.bits = 4 if cells <= 16 else 5
+        cls.mask = (1 << cls.bits) - 1
+        cls.neighbours = util.gridNeighbours(cls.size)
+        cls.moveTargets = tuple(dict(moves) for moves in cls.neighbours)
+        cls.swaps = tuple(tuple((move, target, blank * cls.bits, target * cls.bits)
+                                for move, target in cls.neighbours[blank])
+                          for blank in range(cells))
+        cls.goalBoard = cls.pack(range(cells))
+
+    def __init__(self, numbers):
+        """
+          Constructs a board from the numbers 0 to cellCount - 1 read row
+        by row, with 0 for the blank.
+
+        >>> print(Puzzle15State(list(range(1, 16)) + [0]).blankLocation)
+        (3, 3)
+        """
+        numbers = list(numbers)
+        if sorted(numbers) != list(range(self.cellCount)):
+            raise ValueError("Not a %dx%d puzzle: %s" % (self.size, self.size, numbers))
+        self.board = self.pack(numbers)
+        self.blank = numbers.index(0)
+
+    @classmethod
+    def pack(cls, numbers):
+        "Packs a sequence of cellCount numbers into a board integer."
+        board = 0
+        for index, number in enumerate(numbers):
+            board |= number << (index * cls.bits)
+        return board
+
+    @classmethod
+    def fromBoard(cls, board, blank):
+        "Builds a state directly from a packed board and its blank index."
+        state = object.__new__(cls)
+        state.board = board
+        state.blank = blank
+        return state
+
+    def numbers(self):
+        "Returns the list of numbers on the board, row by row."
+        return [(self.board >> (index * self.bits)) & self.mask for index in range(self.cellCount)]
+
+    @property
+    def cells(self):
+        "The board as a list of rows, for display."
+        numbers = self.numbers()
+        return [numbers[row:row + self.size] for row in range(0, self.cellCount, self.size)]
+
+    @property
+    def blankLocation(self):
+        return divmod(self.blank, self.size)
+
+    def isGoal(self):
+        """
+          Checks whether the board reads 0 (the blank), 1, 2, ... row by row.
+
+        >>> Puzzle15State(range(16)).isGoal()
+        True
+        """
+        return self.board == self.goalBoard
+
+    def legalMoves(self):
+        """
+          Returns a list of legal moves of the blank.
+
+        >>> Puzzle24State(range(25)).legalMoves()
+        ['down', 'right']
+        """
+        return [move for move, _ in self.neighbours[self.blank]]
+
+    def result(self, move):
+        """
+          Returns a new state with the blank moved.  Illegal moves raise a
+        ValueError.
+
+        >>> Puzzle15State(range(16)).result('right') == Puzzle15State([1, 0] + list(range(2, 16)))
+        True
+        """
+        blank = self.blank
+        target = self.moveTargets[blank].get(move)
+        if target is None:
+            raise ValueError("Illegal Move: %s" % move)
+
+        tile = (self.board >> (target * self.bits)) & self.mask
+        board = self.board + (tile << (blank * self.bits)) - (tile << (target * self.bits))
+        return self.fromBoard(board, target)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.board == other.board
+
+    def __hash__(self):
+        return hash(self.board)
+
+    def __str__(self):
+        width = len(str(self.cellCount - 1))
+        horizontalLine = '-' * (self.size * (width + 3) + 1)
+        lines = [horizontalLine]
+        for row in self.cells:
+            lines.append('|' + ''.join(' %*s |' % (width, number or ' ') for number in row))
+            lines.append(horizontalLine)
+        return '\n'.join(lines)
+
+class Puzzle15State(SlidingPuzzleState):
+    "A 4x4 board."
+    __slots__ = ()
+    size = 4
+
+class Puzzle24State(SlidingPuzzleState):
+    "A 5x5 board."
+    __slots__ = ()
+    size = 5
+
+# The 3x3 board is the eight puzzle's own state, which has the same layout fields
+STATE_CLASSES = {cls.size: cls for cls in (eightpuzzle.EightPuzzleState, Puzzle15State, Puzzle24State)}
+
+def makeState(numbers):
+    """
+      Returns the state for a list of n * n numbers, picking the class by
+    the length of the list.
+
+    >>> type(makeState(range(16))).__name__
+    'Puzzle15State'
+    >>> type(makeState(range(9))).__name__
+    'EightPuzzleState'
+    """
+    numbers = list(numbers)
+    size = int(round(len(numbers) ** 0.5))
+    if size * size != len(numbers) or size not in STATE_CLASSES:
+        raise ValueError("Puzzles must be %s grids, not %d cells" %
+                         (', '.join('%dx%d' % (size, size) for size in STATE_CLASSES), len(numbers)))
+    return STATE_CLASSES[size](numbers)
+
+def tileWeightedCosts(size):
+    "Returns the tileCosts under which moving tile k costs k."
+    return tuple(range(size * size))
+
+class SlidingPuzzleSearchProblem(search.SearchProblem):
+    """
+      A SearchProblem for a sliding puzzle of any size, with the same
+    interface as EightPuzzleSearchProblem.  The goal defaults to the
+    puzzle's goalBoard, and tileCosts optionally gives the cost of sliding
+    each tile (see tileWeightedCosts).
+    """
+    def __init__(self, puzzle, goal=None, tileCosts=None):
+        stateClass = type(puzzle)
+        if goal is None:
+            goal = stateClass.fromBoard(stateClass.goalBoard, 0)
+        elif type(goal) is not stateClass:
+            raise ValueError("The goal is not the same size as the puzzle")
+        self.puzzle = puzzle
+        self.goal = goal
+        self.tileCosts = tileCosts
+
+    def getStartState(self):
+        return self.puzzle
+
+    def isGoalState(self, state):
+        return state == self.goal
+
+    def getSuccessors(self, state):
+        """
+          Returns list of (successor, action, stepCost) triples, one for
+        each legal move of the blank.
+        """
+        board = state.board
+        mask = state.mask
+        tileCosts = self.tileCosts
+        stateClass = type(state)
+        newState = object.__new__
+        succ = []
+        for move, target, blankShift, targetShift in state.swaps[state.blank]:
+            tile = (board >> targetShift) & mask
+            nextState = newState(stateClass)
+            nextState.board = board + (tile << blankShift) - (tile << targetShift)
+            nextState.blank = target
+            succ.append((nextState, move, 1 if tileCosts is None else tileCosts[tile]))
+        return succ
+
+    def iterSuccessors(self, state):
+        """
+          Yields the triples of getSuccessors one at a time, making each
+        successor only when it is asked for.
+
+        >>> problem = SlidingPuzzleSearchProblem(Puzzle15State([1, 0] + list(range(2, 16))))
+        >>> start = problem.getStartState()
+        >>> list(problem.iterSuccessors(start)) == problem.getSuccessors(start)
+        True
+        """
+        board = state.board
+        mask = state.mask
+        tileCosts = self.tileCosts
+        stateClass = type(state)
+        newState = object.__new__
+        for move, target, blankShift, targetShift in state.swaps[state.blank]:
+            tile = (board >> targetShift) & mask
+            nextState = newState(stateClass)
+            nextState.board = board + (tile << blankShift) - (tile << targetShift)
+            nextState.blank = target
+            yield nextState, move, 1 if tileCosts is None else tileCosts[tile]
+
+    def getGoalState(self):
+        return self.goal
+
+    def getPredecessors(self, state):
+        "Returns the successors with the inverse moves: moves are reversible."
+        return [(prevState, eightpuzzle.INVERSE_MOVES[move], stepCost)
+                for prevState, move, stepCost in self.getSuccessors(state)]
+
+    def reverse(self):
+        "Returns the problem of getting from the goal back to the start."
+        return SlidingPuzzleSearchProblem(self.goal, self.puzzle, self.tileCosts)
+
+    def getCostOfActions(self, actions):
+        "Returns the total cost of a sequence of legal moves."
+        if self.tileCosts is None:
+            return len(actions)
+        cost = 0
+        state = self.puzzle
+        for action in actions:
+            nextState = state.result(action)
+            cost += self.tileCosts[(nextState.board >> (state.blank * state.bits)) & state.mask]
+            state = nextState
+        return cost
+
+def createRandomPuzzle(size, moves=100):
+    "Creates a puzzle by applying 'moves' random moves to the goal board."
+    stateClass = STATE_CLASSES[size]
+    puzzle = stateClass.fromBoard(stateClass.goalBoard, 0)
+    for i in range(moves):
+        puzzle = puzzle.result(random.choice(puzzle.legalMoves()))
+    return puzzle
@@ -0,0 +1,153 @@
+# solutioncache.py
+# ----------------
+# Remembers solved queries in memory and on disk.
+
+
+"""
+A query is the start board, the goal board, the search, its heuristic, the
+step costs, whether it was normalized and the search options; the same
+query always gets the same answer, so run_search in eightpuzzle.py can
+look it up here before searching.
+
+Answers are kept in two tiers.  The memory tier is a least-recently-used
+map held to a total size in bytes, and the disk tier is an SQLite file
+that survives restarts (by default under util.TABLE_DIR, next to the
+heuristic tables).  A lookup tries memory, then disk, and an answer found
+on disk is copied into memory.  Both tiers count their hits, misses and
+evictions; the disk tier only evicts when it is given a maximum number of
+entries.
+
+Answers are stored as JSON, so tuples in the search stats come back as
+lists.  A cache may be passed to worker processes: each process opens its
+own connection to the file and starts with an empty memory tier.
+"""
+
+import collections
+import json
+import os
+import sqlite3
+import time
+
+import util
+
+DEFAULT_PATH = os.path.join(util.TABLE_DIR, 'solutions.sqlite')
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024
+
+# The parts of run_search's metrics that are stored; the rest describe the call
+STORED_METRICS = ('path', 'path_cost', 'nodes_expanded', 'max_depth', 'time', 'stats')
+
+def _optionValue(value):
+    # Frontier objects are described by their class and tie-breaking
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return [type(value).__name__, getattr(value, 'tieBreaking', None)]
+
+def queryKey(problem, searchName, heuristic=None, normalize=False, options=None):
+    """
+    Returns the cache key of a query: a JSON string of the start and goal
+    boards (with the board size), the search, the heuristic's name, the
+    step costs, normalize and the search options.
+    """
+    start = problem.getStartState()
+    tileCosts = getattr(problem, 'tileCosts', None)
+    return json.dumps([start.size, start.board, problem.goal.board, searchName,
+                       heuristic.__name__ if heuristic else None,
+                       list(tileCosts) if tileCosts is not None else None, bool(normalize),
+                       sorted((name, _optionValue(value)) for name, value in (options or {}).items())])
+
+class SolutionCache:
+    """
+      Two-tier cache of search answers (see above).  'memoryBytes' bounds
+    the memory tier by the size of the stored answers, 'path' is the SQLite
+    file of the disk tier (None for memory only) and 'diskEntries' bounds
+    the number of answers kept on disk (None for no bound).
+    """
+    def __init__(self, path=DEFAULT_PATH, memoryBytes=DEFAULT_MEMORY_BYTES, diskEntries=None):
+        self.path = path
+        self.memoryBytes = memoryBytes
+        self.diskEntries = diskEntries
+        self._reset()
+
+    def _reset(self):
+        self.memory = collections.OrderedDict()  # key -> stored JSON
+        self.memoryUsed = 0
+        self.counters = {'memory': dict(hits=0, misses=0, evictions=0),
+                         'disk': dict(hits=0, misses=0, evictions=0)}
+        self.connection = None
+        self.pid = os.getpid()
+
+    def __getstate__(self):
+        # Connections cannot be pickled; a worker opens its own
+        return dict(path=self.path, memoryBytes=self.memoryBytes, diskEntries=self.diskEntries)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset()
+
+    def _connect(self):
+        # A forked process must not share its parent's connection
+        if self.pid != os.getpid():
+            self._reset()
+        if self.connection is None and self.path is not None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=30)
+            self.connection.execute('CREATE TABLE IF NOT EXISTS solutions '
+                                    '(key TEXT PRIMARY KEY, answer TEXT, used REAL)')
+        return self.connection
+
+    def _remember(self, key, answer):
+        if key in self.memory:
+            self.memoryUsed -= len(self.memory.pop(key))
+        self.memory[key] = answer
+        self.memoryUsed += len(answer)
+        while self.memoryUsed > self.memoryBytes and self.memory:
+            self.memoryUsed -= len(self.memory.popitem(last=False)[1])
+            self.counters['memory']['evictions'] += 1
+
+    def get(self, key):
+        """
+        Returns the stored metrics for 'key' and the tier they came from
+        ('memory' or 'disk'), or (None, None) if the query is not cached.
+        """
+        connection = self._connect()
+        answer = self.memory.get(key)
+        if answer is not None:
+            self.memory.move_to_end(key)
+            self.counters['memory']['hits'] += 1
+            return json.loads(answer), 'memory'
+        self.counters['memory']['misses'] += 1
+
+        if connection is None:
+            return None, None
+        row = connection.execute('SELECT answer FROM solutions WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.counters['disk']['misses'] += 1
+            return None, None
+        self.counters['disk']['hits'] += 1
+        with connection:
+            connection.execute('UPDATE solutions SET used = ? WHERE key = ?', (time.time(), key))
+        self._remember(key, row[0])
+        return json.loads(row[0]), 'disk'
+
+    def put(self, key, metrics):
+        "Stores the STORED_METRICS of 'metrics' under 'key' in both tiers."
+        answer = json.dumps(dict((name, metrics[name]) for name in STORED_METRICS))
+        self._remember(key, answer)
+        connection = self._connect()
+        if connection is None:
+            return
+        with connection:
+            connection.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)', (key, answer, time.time()))
+            if self.diskEntries is not None:
+                count = connection.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+                if count > self.diskEntries:
+                    connection.execute('DELETE FROM solutions WHERE key IN (SELECT key FROM solutions '
+                                       'ORDER BY used LIMIT ?)', (count - self.diskEntries,))
+                    self.counters['disk']['evictions'] += count - self.diskEntries
+
+    def close(self):
+        if self.connection is not None and self.pid == os.getpid():
+            self.connection.close()
+        self.connection = None
@@ -0,0 +1,83 @@
+# test_batch.py
+# -------------
+# Checks of batch.py: parallel batches and worker crashes.
+
+import io
+import json
+import multiprocessing
+import os
+import unittest
+from unittest import mock
+
+import batch
+import eightpuzzle
+import patterndb
+
+# Instances whose worker process dies, as if killed for running out of memory
+CRASHING = ('crash-a', 'crash-b')
+
+_solveInstance = batch.solveInstance
+
+def _crashingSolveInstance(number, instance, *args, **kwargs):
+    if instance.get('id') in CRASHING:
+        os._exit(1)
+    return _solveInstance(number, instance, *args, **kwargs)
+
+def _instances(count):
+    instances = []
+    for number in range(1, count + 1):
+        puzzle = eightpuzzle.createRandomEightPuzzle(number % 7 + 3)
+        instance = {'initial': eightpuzzle.unpackBoard(puzzle.board)}
+        if number in (7, 19):
+            instance['id'] = CRASHING[number == 19]
+        instances.append(instance)
+    return instances
+
+def _run(instances, **options):
+    out = io.StringIO()
+    count = batch.solveParallel(iter(instances), out, 'A*', 'manhattan', **options)
+    return count, [json.loads(line) for line in out.getvalue().splitlines()]
+
+class WarmUpTest(unittest.TestCase):
+
+    def testBidirectionalAStarLoadsCanonicalGoals(self):
+        batch.warmUp('BiA*', 'other')
+        for goalBoard in eightpuzzle.CANONICAL_GOALS:
+            self.assertIn((goalBoard, patterndb.DEFAULT_PARTITION), patterndb._databases.entries)
+
+class SolveParallelTest(unittest.TestCase):
+
+    def testResultsMatchSolveBatch(self):
+        instances = _instances(12)
+        out = io.StringIO()
+        batch.solveBatch(iter(instances), out, 'A*', 'manhattan')
+        serial = [json.loads(line) for line in out.getvalue().splitlines()]
+        for ordered in (True, False):
+            count, results = _run(instances, workers=2, chunksize=3, ordered=ordered)
+            self.assertEqual(count, 12)
+            if not ordered:
+                results.sort(key=lambda result: str(result['id']))
+                serial.sort(key=lambda result: str(result['id']))
+            self.assertEqual([(r['id'], r['cost']) for r in results],
+                             [(r['id'], r['cost']) for r in serial])
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == 'fork',
+                         'the crash is injected into forked workers')
+    def testOnlyCrashingInstancesFail(self):
+        instances = _instances(30)
+        with mock.patch.object(batch, 'solveInstance', _crashingSolveInstance):
+            for chunksize in (1, 4):
+                for ordered in (True, False):
+                    count, results = _run(instances, workers=3, chunksize=chunksize, ordered=ordered)
+                    self.assertEqual(count, 30)
+                    self.assertEqual(len(results), 30)
+                    failed = sorted((result['id'] for result in results if 'error' in result), key=str)
+                    self.assertEqual(failed, sorted(CRASHING))
+                    self.assertTrue(all(result['solved'] for result in results if 'error' not in result))
+                    if ordered:
+                        self.assertEqual([result['id'] for result in results],
+                                         [batch._instanceId(number, instance)
+                                          for number, instance in enumerate(instances, 1)])
+
+if __name__ == '__main__':
+    unittest.main()
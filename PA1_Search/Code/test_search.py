@@ -0,0 +1,102 @@
+# test_search.py
+# --------------
+# Checks that the optimal searches find optimal paths on fixed instances.
+
+import unittest
+
+import eightpuzzle
+import hdastar
+import search
+import util
+import vectorbfs
+
+# (start numbers, fewest moves to eightpuzzle.GOAL_BOARD)
+INSTANCES = [(eightpuzzle.EIGHT_PUZZLE_DATA[1], 24),
+             (eightpuzzle.EIGHT_PUZZLE_DATA[2], 10),
+             (eightpuzzle.EIGHT_PUZZLE_DATA[3], 14),
+             (eightpuzzle.EIGHT_PUZZLE_DATA[4], 14),
+             (eightpuzzle.EIGHT_PUZZLE_DATA[5], 12),
+             ([8, 6, 7, 2, 5, 4, 3, 0, 1], 27)]
+
+# (start numbers, least cost under TILE_WEIGHTED_COSTS)
+TILE_COST_INSTANCES = [(eightpuzzle.EIGHT_PUZZLE_DATA[4], 63),
+                       (eightpuzzle.EIGHT_PUZZLE_DATA[5], 56)]
+
+HEURISTICS = [search.misplacedTilesHeuristic, search.manhattanDistanceHeuristic,
+              search.patternDatabaseHeuristic, search.exactDistanceHeuristic]
+
+def _problem(numbers, tileCosts=None):
+    return eightpuzzle.EightPuzzleSearchProblem(eightpuzzle.EightPuzzleState(numbers), tileCosts=tileCosts)
+
+class OptimalSearchTest(unittest.TestCase):
+
+    def assertOptimal(self, problem, result, cost):
+        path = result[0]
+        state = problem.getStartState()
+        for action in path:
+            state = state.result(action)
+        self.assertTrue(problem.isGoalState(state))
+        self.assertEqual(problem.getCostOfActions(path), cost)
+
+    def testUniformCostOnEveryFrontier(self):
+        for frontier in ('heap', 'bucket', 'two-level', 'indexed'):
+            for numbers, moves in INSTANCES[:-1]:  # the last takes UCS most of the board space
+                problem = _problem(numbers)
+                self.assertOptimal(problem, search.uniformCostSearch(problem, frontier), moves)
+
+    def testAStarOnEveryFrontier(self):
+        for frontier in ('heap', 'bucket', 'indexed'):
+            for heuristic in HEURISTICS:
+                for numbers, moves in INSTANCES:
+                    problem = _problem(numbers)
+                    self.assertOptimal(problem, search.aStarSearch(problem, heuristic, frontier), moves)
+        for tieBreaking in util.TwoLevelBucketFrontier.TIE_BREAKING:
+            for numbers, moves in INSTANCES:
+                problem = _problem(numbers)
+                frontier = util.TwoLevelBucketFrontier(tieBreaking)
+                result = search.aStarSearch(problem, search.manhattanDistanceHeuristic, frontier)
+                self.assertOptimal(problem, result, moves)
+
+    def testIterativeDeepeningAStar(self):
+        for heuristic in HEURISTICS[1:]:
+            for numbers, moves in INSTANCES:
+                problem = _problem(numbers)
+                self.assertOptimal(problem, search.idaStarSearch(problem, heuristic), moves)
+
+    def testBidirectionalSearches(self):
+        for numbers, moves in INSTANCES:
+            problem = _problem(numbers)
+            self.assertOptimal(problem, search.bidirectionalBreadthFirstSearch(problem), moves)
+            for heuristic in HEURISTICS:
+                self.assertOptimal(problem, search.bidirectionalAStarSearch(problem, heuristic), moves)
+
+    def testIterativeDeepeningAndOracle(self):
+        for numbers, moves in INSTANCES:
+            problem = _problem(numbers)
+            self.assertOptimal(problem, search.distanceOracleSearch(problem), moves)
+            if moves <= 14:
+                self.assertOptimal(problem, search.iterativeDeepeningSearch(problem), moves)
+
+    @unittest.skipIf(vectorbfs.np is None, 'VecBFS needs NumPy')
+    def testVectorizedBreadthFirstSearch(self):
+        for numbers, moves in INSTANCES:
+            problem = _problem(numbers)
+            self.assertOptimal(problem, vectorbfs.vectorizedBreadthFirstSearch(problem), moves)
+
+    def testHashDistributedAStar(self):
+        for numbers, moves in INSTANCES[1:3]:
+            problem = _problem(numbers)
+            result = hdastar.hashDistributedAStarSearch(problem, search.manhattanDistanceHeuristic, workers=2)
+            self.assertOptimal(problem, result, moves)
+
+    def testTileCosts(self):
+        for numbers, cost in TILE_COST_INSTANCES:
+            problem = _problem(numbers, eightpuzzle.TILE_WEIGHTED_COSTS)
+            self.assertOptimal(problem, search.uniformCostSearch(problem), cost)
+            for heuristic in HEURISTICS[:2]:
+                self.assertOptimal(problem, search.aStarSearch(problem, heuristic), cost)
+                self.assertOptimal(problem, search.idaStarSearch(problem, heuristic), cost)
+                self.assertOptimal(problem, search.bidirectionalAStarSearch(problem, heuristic), cost)
+
+if __name__ == '__main__':
+    unittest.main()
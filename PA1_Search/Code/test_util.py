@@ -0,0 +1,166 @@
+# test_util.py
+# ------------
+# Checks of the data structures added to util.py.
+
+import multiprocessing
+import os
+import tempfile
+import unittest
+from multiprocessing import shared_memory
+from unittest import mock
+
+import util
+
+# (item, priority, g) in push order, and the pop order of each frontier
+PUSHES = [('a', 3, 1), ('b', 2, 0), ('c', 3, 2), ('d', 3, 0), ('e', 2, 2), ('f', 2, 1)]
+POP_ORDERS = {
+    'fifo': 'abcdef',
+    'lifo': 'fedcba',
+    'heap': 'befacd',
+    'bucket': 'befacd',
+    'two-level': 'efbcad',
+}
+TWO_LEVEL_POP_ORDERS = {'fifo': 'befacd', 'lifo': 'febdca', 'high-g': 'efbcad', 'low-h': 'efbcad'}
+
+def _popAll(frontier):
+    for item, priority, g in PUSHES:
+        frontier.push(item, priority, g)
+    return ''.join(frontier.pop() for _ in PUSHES)
+
+class FrontierTest(unittest.TestCase):
+
+    def testPopOrder(self):
+        for name, order in POP_ORDERS.items():
+            self.assertEqual(_popAll(util.makeFrontier(name)), order, name)
+        for tieBreaking, order in TWO_LEVEL_POP_ORDERS.items():
+            self.assertEqual(_popAll(util.TwoLevelBucketFrontier(tieBreaking)), order, tieBreaking)
+
+    def testCounters(self):
+        for name in util.FRONTIERS:
+            frontier = util.makeFrontier(name)
+            # The indexed frontier keys items by their first element
+            items = [(letter, index) for index, letter in enumerate('abcd')]
+            for item in items[:3]:
+                frontier.push(item, 2, 1)
+            frontier.pop()
+            frontier.pop()
+            frontier.push(items[3], 2, 1)
+            self.assertEqual(len(frontier), 2, name)
+            self.assertEqual(frontier.stats()['frontier_pushes'], 4, name)
+            self.assertEqual(frontier.stats()['frontier_pops'], 2, name)
+            self.assertEqual(frontier.stats()['frontier_peak'], 3, name)
+            frontier.pop()
+            frontier.pop()
+            self.assertTrue(frontier.isEmpty(), name)
+
+    def testIndexedFrontierKeepsTheCheaperCopy(self):
+        frontier = util.makeFrontier('indexed')
+        frontier.push(('s', 'first'), 5)
+        frontier.push(('t', 'only'), 4)
+        frontier.push(('s', 'cheaper'), 3)
+        frontier.push(('s', 'dearer'), 6)
+        self.assertEqual([frontier.pop(), frontier.pop()], [('s', 'cheaper'), ('t', 'only')])
+        stats = frontier.stats()
+        self.assertEqual((stats['frontier_decreased'], stats['frontier_rejected']), (1, 1))
+
+    def testBadPriorities(self):
+        self.assertRaises(ValueError, util.makeFrontier('bucket').push, 'a', -1)
+        self.assertRaises(ValueError, util.TwoLevelBucketFrontier('high-g').push, 'a', -1, 0)
+        self.assertRaises(ValueError, util.TwoLevelBucketFrontier('low-h').push, 'a', 2, 3)
+        self.assertRaises(IndexError, util.makeFrontier('bucket').pop)
+
+    def testMakeFrontier(self):
+        frontier = util.TwoLevelBucketFrontier('lifo')
+        self.assertIs(util.makeFrontier(frontier), frontier)
+        self.assertEqual(util.makeFrontier('two-level', tieBreaking='low-h').tieBreaking, 'low-h')
+        self.assertRaises(ValueError, util.makeFrontier, 'stack')
+
+class IndexedHeapTest(unittest.TestCase):
+
+    def testPopOrder(self):
+        heap = util.IndexedHeap()
+        priorities = [(key * 7) % 11 for key in range(30)]
+        for key, priority in enumerate(priorities):
+            heap.push(key, 'value %d' % key, priority)
+        popped = [heap.pop() for _ in range(len(heap))]
+        # Lowest priority first, equal priorities in insertion order
+        expected = sorted(range(30), key=lambda key: (priorities[key], key))
+        self.assertEqual([key for key, _, _ in popped], expected)
+        self.assertEqual(popped[0], (expected[0], 'value %d' % expected[0], 0))
+        self.assertTrue(heap.isEmpty())
+
+    def testDecreaseKey(self):
+        heap = util.IndexedHeap()
+        for key in 'abcde':
+            heap.push(key, key, 10)
+        heap.decreaseKey('d', 'new d', 2)
+        heap.decreaseKey('b', 'new b', 5)
+        self.assertEqual(heap.priority('d'), 2)
+        self.assertRaises(ValueError, heap.decreaseKey, 'a', 'a', 11)
+        self.assertEqual([heap.pop() for _ in range(3)],
+                         [('d', 'new d', 2), ('b', 'new b', 5), ('a', 'a', 10)])
+
+    def testRemove(self):
+        heap = util.IndexedHeap()
+        for key, priority in zip('abcdef', (4, 1, 5, 2, 6, 3)):
+            heap.push(key, key.upper(), priority)
+        self.assertEqual(heap.remove('d'), 'D')
+        self.assertEqual(heap.remove('e'), 'E')
+        self.assertNotIn('d', heap)
+        self.assertIn('a', heap)
+        self.assertEqual(len(heap), 4)
+        self.assertEqual([heap.pop()[0] for _ in range(4)], ['b', 'f', 'a', 'c'])
+
+class NodeStoreTest(unittest.TestCase):
+
+    def testPath(self):
+        nodes = util.NodeStore()
+        left = nodes.add(util.NodeStore.ROOT, 'left')
+        up = nodes.add(left, 'up')
+        nodes.add(left, 'down')
+        self.assertEqual(nodes.path(up), ['left', 'up'])
+        self.assertEqual(nodes.path(util.NodeStore.ROOT), [])
+        self.assertEqual(len(nodes), 4)
+
+class _Table:
+    def __init__(self, name):
+        self.name = name
+        self.data = util.loadTable(name, lambda: name.encode())
+
+class TableCacheTest(unittest.TestCase):
+
+    def testEvictionReleasesTables(self):
+        with tempfile.TemporaryDirectory() as directory, mock.patch.object(util, 'TABLE_DIR', directory):
+            loads = []
+            def load(key):
+                loads.append(key)
+                return _Table('cache_test_%d.bin' % key)
+            cache = util.TableCache(load, size=2)
+            self.assertEqual(bytes(cache.get(1).data), b'cache_test_1.bin')
+            cache.get(2)
+            cache.get(1)
+            cache.get(3)  # drops 2, the least recently used
+            self.assertEqual(loads, [1, 2, 3])
+            self.assertNotIn('cache_test_2.bin', util.tableRegistry.tables)
+            self.assertIn('cache_test_1.bin', util.tableRegistry.tables)
+            cache.get(2)
+            self.assertEqual(loads, [1, 2, 3, 2])
+            for key in (3, 2):
+                util.tableRegistry.release('cache_test_%d.bin' % key)
+
+def _publishTable(name):
+    util.tableRegistry.publish(name, b'table' * 100)
+
+class TableRegistryTest(unittest.TestCase):
+
+    def testChildUnlinksWhatItPublishes(self):
+        name = 'test_child_%d.bin' % os.getpid()
+        child = multiprocessing.Process(target=_publishTable, args=(name,))
+        child.start()
+        child.join()
+        self.assertEqual(child.exitcode, 0)
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(util.tableRegistry._blockName(name))
+
+if __name__ == '__main__':
+    unittest.main()
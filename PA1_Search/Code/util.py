@@ -29,6 +29,11 @@
 import sys
 import inspect
 import heapq, random
+import os, mmap, atexit, zlib
+from array import array
+from multiprocessing import shared_memory
+from multiprocessing.util import Finalize
+from collections import deque, OrderedDict
 
 
 class FixedRandom:
@@ -150,18 +155,18 @@ class Stack:
 class Queue:
     "A container with a first-in-first-out (FIFO) queuing policy."
     def __init__(self):
-        self.list = []
+        self.list = deque()
 
     def push(self,item):
         "Enqueue the 'item' into the queue"
-        self.list.insert(0,item)
+        self.list.append(item)
 
     def pop(self):
         """
           Dequeue the earliest enqueued item still in the queue. This
           operation removes the item from the queue.
         """
-        return self.list.pop()
+        return self.list.popleft()
 
     def isEmpty(self):
         "Returns true if the queue is empty"
@@ -222,10 +227,619 @@ class PriorityQueueWithFunction(PriorityQueue):
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
 
+class IndexedHeap:
+    """
+      A binary min-heap of keys with priorities, plus a map from each key to
+      its slot in the heap.  Each key is held at most once; contains is O(1)
+      and push, pop, decreaseKey and remove are O(log n).  Each key carries
+      a value, returned by pop.  Equal priorities pop in insertion order.
+    """
+    def __init__(self):
+        self.heap = []       # [(priority, insertion count), key, value]
+        self.positions = {}  # key -> index in heap
+        self.count = 0
+
+    def push(self, key, value, priority):
+        "Adds a key that is not in the heap yet"
+        entry = [(priority, self.count), key, value]
+        self.count += 1
+        self.heap.append(entry)
+        self.positions[key] = len(self.heap) - 1
+        self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        "Removes the key with the lowest priority; returns (key, value, priority)"
+        entry = self.heap[0]
+        self._removeAt(0)
+        return entry[1], entry[2], entry[0][0]
+
+    def contains(self, key):
+        return key in self.positions
+
+    __contains__ = contains
+
+    def priority(self, key):
+        return self.heap[self.positions[key]][0][0]
+
+    def decreaseKey(self, key, value, priority):
+        "Lowers the priority of a key already in the heap and replaces its value"
+        index = self.positions[key]
+        entry = self.heap[index]
+        if priority > entry[0][0]:
+            raise ValueError("decreaseKey cannot raise a priority")
+        entry[0] = (priority, entry[0][1])
+        entry[2] = value
+        self._siftUp(index)
+
+    def remove(self, key):
+        "Removes a key; returns its value"
+        index = self.positions[key]
+        value = self.heap[index][2]
+        self._removeAt(index)
+        return value
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def _removeAt(self, index):
+        heap = self.heap
+        del self.positions[heap[index][1]]
+        last = heap.pop()
+        if index < len(heap):
+            heap[index] = last
+            self.positions[last[1]] = index
+            self._siftDown(index)
+            self._siftUp(index)
+
+    def _siftUp(self, index):
+        heap = self.heap
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if heap[parent][0] <= entry[0]:
+                break
+            heap[index] = heap[parent]
+            self.positions[heap[index][1]] = index
+            index = parent
+        heap[index] = entry
+        self.positions[entry[1]] = index
+
+    def _siftDown(self, index):
+        heap = self.heap
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1][0] < heap[child][0]:
+                child += 1
+            if entry[0] <= heap[child][0]:
+                break
+            heap[index] = heap[child]
+            self.positions[heap[index][1]] = index
+            index = child
+        heap[index] = entry
+        self.positions[entry[1]] = index
+
+"""
+ Frontiers: interchangeable containers a search can pick by name
+"""
+
+class Frontier:
+    """
+      The interface shared by all frontiers.  push takes a priority, which
+      the FIFO and LIFO frontiers ignore; lower priorities pop first from
+      the others.  It also takes the item's path cost g, which only the
+      two-level bucket frontier uses to break ties.  Every frontier counts
+      its pushes and pops and records its peak size.
+    """
+    def __init__(self):
+        self.pushes = 0
+        self.pops = 0
+        self.peak = 0
+
+    def push(self, item, priority=0, g=0):
+        raiseNotDefined()
+
+    def pop(self):
+        raiseNotDefined()
+
+    def __len__(self):
+        raiseNotDefined()
+
+    def isEmpty(self):
+        return len(self) == 0
+
+    def stats(self):
+        return {'frontier_pushes': self.pushes, 'frontier_pops': self.pops,
+                'frontier_peak': self.peak}
+
+class FifoFrontier(Frontier):
+    "First-in-first-out; O(1) push and pop."
+    def __init__(self):
+        Frontier.__init__(self)
+        self.items = deque()
+
+    def push(self, item, priority=0, g=0):
+        self.items.append(item)
+        self.pushes += 1
+        if len(self.items) > self.peak:
+            self.peak = len(self.items)
+
+    def pop(self):
+        self.pops += 1
+        return self.items.popleft()
+
+    def __len__(self):
+        return len(self.items)
+
+class LifoFrontier(Frontier):
+    "Last-in-first-out; O(1) push and pop."
+    def __init__(self):
+        Frontier.__init__(self)
+        self.items = []
+
+    def push(self, item, priority=0, g=0):
+        self.items.append(item)
+        self.pushes += 1
+        if len(self.items) > self.peak:
+            self.peak = len(self.items)
+
+    def pop(self):
+        self.pops += 1
+        return self.items.pop()
+
+    def __len__(self):
+        return len(self.items)
+
+class HeapFrontier(Frontier):
+    "Binary heap; O(log n) push and pop, first-in-first-out among equal priorities."
+    def __init__(self):
+        Frontier.__init__(self)
+        self.heap = []
+
+    def push(self, item, priority=0, g=0):
+        heapq.heappush(self.heap, (priority, self.pushes, item))
+        self.pushes += 1
+        if len(self.heap) > self.peak:
+            self.peak = len(self.heap)
+
+    def pop(self):
+        self.pops += 1
+        return heapq.heappop(self.heap)[2]
+
+    def __len__(self):
+        return len(self.heap)
+
+class BucketFrontier(Frontier):
+    """
+      One FIFO bucket per priority, for small non-negative integer
+      priorities.  Push is O(1) and pop is O(1) amortized, since the
+      minimum only moves up except when something is pushed below it.
+    """
+    def __init__(self):
+        Frontier.__init__(self)
+        self.buckets = []
+        self.minimum = 0
+        self.size = 0
+
+    def push(self, item, priority=0, g=0):
+        if priority < 0:
+            raise ValueError("BucketFrontier needs non-negative integer priorities")
+        while len(self.buckets) <= priority:
+            self.buckets.append(deque())
+        self.buckets[priority].append(item)
+        if priority < self.minimum:
+            self.minimum = priority
+        self.size += 1
+        self.pushes += 1
+        if self.size > self.peak:
+            self.peak = self.size
+
+    def pop(self):
+        if self.size == 0:
+            raise IndexError("pop from an empty frontier")
+        while not self.buckets[self.minimum]:
+            self.minimum += 1
+        self.size -= 1
+        self.pops += 1
+        return self.buckets[self.minimum].popleft()
+
+    def __len__(self):
+        return self.size
+
+class TwoLevelBucketFrontier(Frontier):
+    """
+      Buckets indexed by integer f (the priority), each split again by g so
+      ties within an f-layer are broken by a chosen policy:
+
+        'fifo'   - first pushed, first popped
+        'lifo'   - last pushed, first popped
+        'high-g' - deepest (largest g) first; in A* this finishes the last
+                   f-layer quickly since those nodes are closest to a goal
+        'low-h'  - smallest h = f - g first
+
+      Within one (f, g) pair the most recent item pops first.  Priorities
+      must be non-negative integers and g may not exceed the priority.
+      Push is O(1) and pop is O(1) amortized for the small integer costs of
+      the puzzle.
+    """
+    TIE_BREAKING = ('fifo', 'lifo', 'high-g', 'low-h')
+
+    def __init__(self, tieBreaking='high-g'):
+        if tieBreaking not in self.TIE_BREAKING:
+            raise ValueError("Unknown tie-breaking '%s'; choose from %s" % (tieBreaking, ', '.join(self.TIE_BREAKING)))
+        Frontier.__init__(self)
+        self.tieBreaking = tieBreaking
+        self.buckets = []  # by f: a deque, a list, or a list of lists by level
+        self.counts = []
+        self.minimum = 0
+        self.size = 0
+
+    def push(self, item, priority=0, g=0):
+        if priority < 0:
+            raise ValueError("TwoLevelBucketFrontier needs non-negative integer priorities")
+        while len(self.buckets) <= priority:
+            self.buckets.append(deque() if self.tieBreaking == 'fifo' else [])
+            self.counts.append(0)
+        bucket = self.buckets[priority]
+        if self.tieBreaking in ('fifo', 'lifo'):
+            bucket.append(item)
+        else:
+            level = g if self.tieBreaking == 'high-g' else priority - g
+            if level < 0:
+                raise ValueError("TwoLevelBucketFrontier needs 0 <= g <= priority")
+            while len(bucket) <= level:
+                bucket.append([])
+            bucket[level].append(item)
+        self.counts[priority] += 1
+        if priority < self.minimum:
+            self.minimum = priority
+        self.size += 1
+        self.pushes += 1
+        if self.size > self.peak:
+            self.peak = self.size
+
+    def pop(self):
+        if self.size == 0:
+            raise IndexError("pop from an empty frontier")
+        while not self.counts[self.minimum]:
+            self.minimum += 1
+        bucket = self.buckets[self.minimum]
+        self.counts[self.minimum] -= 1
+        self.size -= 1
+        self.pops += 1
+
+        if self.tieBreaking == 'fifo':
+            return bucket.popleft()
+        if self.tieBreaking == 'lifo':
+            return bucket.pop()
+        if self.tieBreaking == 'high-g':
+            # Empty top levels are trimmed, so the last level is the highest g
+            while not bucket[-1]:
+                bucket.pop()
+            return bucket[-1].pop()
+        for level in bucket:
+            if level:
+                return level.pop()
+
+    def __len__(self):
+        return self.size
+
+class IndexedHeapFrontier(Frontier):
+    """
+      A frontier that holds each state at most once, using an IndexedHeap
+      keyed by the state (the first element of every search item).  Pushing
+      a state already on the frontier keeps whichever copy has the lower
+      priority, via decreaseKey, instead of adding a duplicate.
+    """
+    def __init__(self):
+        Frontier.__init__(self)
+        self.heap = IndexedHeap()
+        self.decreased = 0
+        self.rejected = 0
+
+    def push(self, item, priority=0, g=0):
+        state = item[0]
+        self.pushes += 1
+        if state in self.heap:
+            if priority < self.heap.priority(state):
+                self.heap.decreaseKey(state, item, priority)
+                self.decreased += 1
+            else:
+                self.rejected += 1
+            return
+        self.heap.push(state, item, priority)
+        if len(self.heap) > self.peak:
+            self.peak = len(self.heap)
+
+    def pop(self):
+        self.pops += 1
+        return self.heap.pop()[1]
+
+    def __len__(self):
+        return len(self.heap)
+
+    def stats(self):
+        stats = Frontier.stats(self)
+        stats['frontier_decreased'] = self.decreased
+        stats['frontier_rejected'] = self.rejected
+        return stats
+
+FRONTIERS = {
+    'fifo': FifoFrontier,
+    'lifo': LifoFrontier,
+    'heap': HeapFrontier,
+    'bucket': BucketFrontier,
+    'two-level': TwoLevelBucketFrontier,
+    'indexed': IndexedHeapFrontier,
+}
+
+def makeFrontier(frontier, **options):
+    """
+      Returns a new, empty frontier of the kind named in FRONTIERS, built
+      with 'options' (e.g. tieBreaking for 'two-level').  A Frontier
+      instance is returned as is, so callers can pass a configured one.
+    """
+    if isinstance(frontier, Frontier):
+        return frontier
+    try:
+        frontierClass = FRONTIERS[frontier]
+    except KeyError:
+        raise ValueError("Unknown frontier '%s'; choose from %s" % (frontier, ', '.join(FRONTIERS)))
+    return frontierClass(**options)
+
+
+class NodeStore:
+    """
+      Stores search nodes as parent pointers.  Each node is only the index
+      of its parent and the action that reached it, so generating a node
+      costs O(1) however deep it is.  The action list is rebuilt once, by
+      walking back from the goal node.
+    """
+    ROOT = 0
+
+    def __init__(self):
+        self.parents = array('l', [-1])
+        self.actions = [None]
+
+    def add(self, parent, action):
+        "Adds a child of node 'parent' reached by 'action'; returns its index"
+        self.parents.append(parent)
+        self.actions.append(action)
+        return len(self.actions) - 1
+
+    def path(self, node):
+        "Returns the list of actions leading from the root to 'node'"
+        actions = []
+        while node != NodeStore.ROOT:
+            actions.append(self.actions[node])
+            node = self.parents[node]
+        actions.reverse()
+        return actions
+
+    def __len__(self):
+        return len(self.actions)
+
+
+# Precomputed tables (pattern databases, distance tables) are saved here.
+# Set EIGHTPUZZLE_TABLES to keep them somewhere else.
+TABLE_DIR = os.environ.get('EIGHTPUZZLE_TABLES',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables'))
+
+# Shared-memory tables are named with this prefix, which child processes
+# inherit through the environment
+SHARED_PREFIX_VARIABLE = 'EIGHTPUZZLE_SHARED_PREFIX'
+
+class TableRegistry:
+    """
+      Read-only tables shared between processes without copying.
+
+      A table is found by name first among the shared-memory blocks
+      published by this process or the process that started it, then as a
+      file under TABLE_DIR, which is memory-mapped.  Either way every
+      process reads the same pages.  A table that is built but cannot be
+      saved is published in shared memory instead, so that worker processes
+      attach to it rather than each building a copy.
+
+      attach() and release() keep a reference count per process; a table is
+      unmapped when its count drops to zero, which is how a TableCache lets
+      go of the tables it evicts.  cleanup() unmaps everything and unlinks
+      the blocks this process published.  It runs at exit, in worker
+      processes too: a block is removed by the process that published it.
+    """
+    def __init__(self, prefix=None):
+        if prefix is None:
+            prefix = os.environ.setdefault(SHARED_PREFIX_VARIABLE, 'ep%d_' % os.getpid())
+        self.prefix = prefix
+        self.exitPid = os.getpid()  # the process whose exit runs cleanup()
+        self.tables = {}      # name -> [buffer, count, handle]
+        self.published = {}   # name -> (SharedMemory, pid of its publisher)
+
+    def _blockName(self, name):
+        # Block names are short on some systems (31 characters on macOS)
+        return '%s%08x' % (self.prefix, zlib.crc32(name.encode()))
+
+    def _attachShared(self, name):
+        try:
+            block = shared_memory.SharedMemory(self._blockName(name))
+        except (FileNotFoundError, OSError):
+            return None, None
+        # Blocks may be rounded up to a page: the first 8 bytes hold the size
+        size = int.from_bytes(block.buf[:8], 'little')
+        return block.buf[8:8 + size].toreadonly(), block
+
+    def _attachFile(self, name):
+        path = os.path.join(TABLE_DIR, name)
+        if not os.path.exists(path):
+            return None, None
+        with open(path, 'rb') as f:
+            table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return table, table
+
+    def attach(self, name):
+        "Returns the table called 'name', or None if nobody has made it yet."
+        entry = self.tables.get(name)
+        if entry is not None:
+            entry[1] += 1
+            return entry[0]
+        for attach in (self._attachShared, self._attachFile):
+            table, handle = attach(name)
+            if table is not None:
+                self.tables[name] = [table, 1, handle]
+                return table
+        return None
+
+    def publish(self, name, data):
+        """
+          Copies 'data' into a new shared-memory block and returns the
+          attached table.  If another process published 'name' first, its
+          block is used instead.
+        """
+        try:
+            block = shared_memory.SharedMemory(self._blockName(name), create=True, size=len(data) + 8)
+        except FileExistsError:
+            return self.attach(name)
+        block.buf[:8] = len(data).to_bytes(8, 'little')
+        block.buf[8:8 + len(data)] = data
+        self.published[name] = (block, os.getpid())
+        if self.exitPid != os.getpid():
+            # Child processes skip atexit, but run multiprocessing's finalizers
+            self.exitPid = os.getpid()
+            Finalize(self, self.cleanup, exitpriority=0)
+        table = block.buf[8:8 + len(data)].toreadonly()
+        self.tables[name] = [table, 1, block]
+        return table
+
+    def save(self, name, data):
+        "Writes 'data' to TABLE_DIR/name; returns False if it cannot be written."
+        path = os.path.join(TABLE_DIR, name)
+        try:
+            os.makedirs(TABLE_DIR, exist_ok=True)
+            temp = '%s.%d.tmp' % (path, os.getpid())
+            with open(temp, 'wb') as f:
+                f.write(data)
+            os.replace(temp, path)
+        except OSError:
+            return False
+        return True
+
+    def load(self, name, build):
+        """
+          Returns the table called 'name', attaching to it if it exists and
+          otherwise calling build() for its bytes, saving them and mapping
+          the file, or publishing them if they cannot be saved.
+        """
+        table = self.attach(name)
+        if table is None:
+            data = build()
+            table = self.attach(name) if self.save(name, data) else self.publish(name, data)
+        return table
+
+    def release(self, name):
+        "Drops one reference to 'name', unmapping it after the last one."
+        entry = self.tables[name]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self.tables[name]
+            self._close(entry)
+
+    def _close(self, entry):
+        table, count, handle = entry
+        if isinstance(table, memoryview):
+            table.release()
+        try:
+            handle.close()
+        except BufferError:
+            pass # Still referenced; it is unmapped when the process exits
+
+    def cleanup(self):
+        "Unmaps every table and unlinks the blocks this process published."
+        for block, publisher in self.published.values():
+            if publisher == os.getpid():
+                try:
+                    block.unlink()
+                except FileNotFoundError:
+                    pass
+        self.published.clear()
+        for entry in self.tables.values():
+            self._close(entry)
+        self.tables.clear()
+
+tableRegistry = TableRegistry()
+atexit.register(tableRegistry.cleanup)
+
+class TableCache:
+    """
+      Keeps the objects built on registry tables (pattern databases,
+      distance tables) for the 'size' most recently used keys.  load(key)
+      makes the object for a key and must give it a 'name' attribute
+      naming its table in tableRegistry; the table is released when the
+      object is dropped, so a long batch over many goals keeps only a few
+      of them mapped.
+    """
+    def __init__(self, load, size=8):
+        self.load = load
+        self.size = size
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        "Returns the object for 'key', loading it if it is not cached."
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            return entry
+        entry = self.entries[key] = self.load(key)
+        while len(self.entries) > self.size:
+            _, dropped = self.entries.popitem(last=False)
+            tableRegistry.release(dropped.name)
+        return entry
+
+def loadTable(name, build):
+    """
+      Returns the table called 'name' from tableRegistry: memory-mapped from
+      TABLE_DIR/name or attached from shared memory.  If neither exists,
+      build() is called for its bytes, which are saved for later runs or,
+      if the file cannot be written, published in shared memory.
+    """
+    return tableRegistry.load(name, build)
+
+
 def manhattanDistance( xy1, xy2 ):
     "Returns the Manhattan distance between points xy1 and xy2"
     return abs( xy1[0] - xy2[0] ) + abs( xy1[1] - xy2[1] )
 
+_gridNeighbours = {}
+
+def gridNeighbours(size):
+    """
+      Returns the moves of a blank on a size x size board: entry i holds
+      the (move, neighbour index) pairs for a blank at cell i, where cell
+      (row, col) has index size * row + col.  Every caller gets the same
+      table for a given size.
+    """
+    table = _gridNeighbours.get(size)
+    if table is None:
+        cells = []
+        for index in range(size * size):
+            row, col = divmod(index, size)
+            moves = []
+            if(row != 0):
+                moves.append(('up', index - size))
+            if(row != size - 1):
+                moves.append(('down', index + size))
+            if(col != 0):
+                moves.append(('left', index - 1))
+            if(col != size - 1):
+                moves.append(('right', index + 1))
+            cells.append(tuple(moves))
+        table = _gridNeighbours[size] = tuple(cells)
+    return table
+
 """
   Data structures and functions useful for various course projects
 
@@ -630,8 +1244,8 @@ class TimeoutFunction:
             try:
                 result = self.function(*args, **keyArgs)
             finally:
+                signal.alarm(0)
                 signal.signal(signal.SIGALRM, old)
-            signal.alarm(0)
         else:
             startTime = time.time()
             result = self.function(*args, **keyArgs)
@@ -0,0 +1,134 @@
+# vectorbfs.py
+# ------------
+# Breadth-first search of the eight puzzle one layer at a time with NumPy.
+
+
+"""
+Instead of expanding one state object at a time, this search keeps each
+BFS layer as NumPy arrays: the packed boards (uint64, four bits per cell as
+in EightPuzzleState), their blank cells, and for path reconstruction the
+index of each board's parent in the previous layer and the move that led
+to it.  All successors of a layer are made at once, one array operation
+per move direction, and duplicates are dropped with a visited map indexed
+by permutation rank (see distancetable.rankBoard) and np.unique.
+
+NumPy is optional: the rest of the project runs without it, and this
+search raises ImportError if it is not installed.
+"""
+
+import distancetable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MOVES = ('up', 'down', 'left', 'right')
+MOVE_OFFSETS = (-3, 3, -1, 1)
+
+# LEGAL[move][blank]: whether the blank at cell 'blank' can make the move
+LEGAL = ((False,) * 3 + (True,) * 6, (True,) * 6 + (False,) * 3,
+         (False, True, True) * 3, (True, True, False) * 3)
+
+def packBoards(cells):
+    "Returns the packed boards (uint64) of an (N, 9) array of tile numbers."
+    cells = np.asarray(cells, dtype=np.uint64).reshape(-1, 9)
+    return (cells << (np.arange(9, dtype=np.uint64) << np.uint64(2))).sum(axis=1, dtype=np.uint64)
+
+def unpackBoards(boards, cells=9, bits=4):
+    """
+    Returns the (N, cells) array of tile numbers of a sequence of packed
+    boards with 'bits' bits per cell (see slidingpuzzle.py for other sizes).
+    """
+    if cells * bits > 64:
+        # Too wide for uint64 (the 24-puzzle), so unpack in Python
+        mask = (1 << bits) - 1
+        return np.array([[(board >> (cell * bits)) & mask for cell in range(cells)] for board in boards],
+                        dtype=np.uint8).reshape(-1, cells)
+    boards = np.asarray(boards, dtype=np.uint64).reshape(-1, 1)
+    shifts = np.arange(cells, dtype=np.uint64) * np.uint64(bits)
+    return ((boards >> shifts) & np.uint64((1 << bits) - 1)).astype(np.uint8)
+
+def rankBoards(boards):
+    "Returns the distancetable.rankBoard() of every board in a uint64 array."
+    ranks = np.zeros(len(boards), dtype=np.int64)
+    used = np.zeros(len(boards), dtype=np.int64)
+    popcount = np.frombuffer(distancetable.POPCOUNT, dtype=np.uint8).astype(np.int64)
+    for cell in range(9):
+        tiles = ((boards >> np.uint64(cell << 2)) & np.uint64(15)).astype(np.int64)
+        ranks += (tiles - popcount[used & ((1 << tiles) - 1)]) * distancetable.FACTORIALS[cell]
+        used |= 1 << tiles
+    return ranks
+
+def _expand(boards, blanks):
+    """
+    Returns the successors of a layer as (boards, blanks, parents, moves),
+    where parents indexes the layer and moves indexes MOVES.
+    """
+    children = []
+    for code, offset in enumerate(MOVE_OFFSETS):
+        parents = np.nonzero(np.array(LEGAL[code])[blanks])[0]
+        blank = blanks[parents].astype(np.uint64)
+        target = blank + np.uint64(offset) if offset > 0 else blank - np.uint64(-offset)
+        board = boards[parents]
+        tiles = (board >> (target << np.uint64(2))) & np.uint64(15)
+        board = board + (tiles << (blank << np.uint64(2))) - (tiles << (target << np.uint64(2)))
+        children.append((board, target.astype(np.uint8), parents, np.full(len(parents), code, dtype=np.uint8)))
+    return tuple(np.concatenate(parts) for parts in zip(*children))
+
+def vectorizedBreadthFirstSearch(problem, stats=None):
+    """
+    Breadth-first search on an eight puzzle problem, one layer at a time.
+    Returns the same (path, nodes expanded, depth) as the other searches;
+    like breadthFirstSearch it finds a path with the fewest moves.
+
+    If 'stats' is a dict, stats['layer_sizes'] receives the number of new
+    boards in each layer.
+    """
+    if np is None:
+        raise ImportError("vectorizedBreadthFirstSearch needs NumPy (pip install numpy)")
+
+    start = problem.getStartState()
+    goalBoard = np.uint64(problem.goal.board)
+    boards = np.array([start.board], dtype=np.uint64)
+    blanks = np.array([start.blank], dtype=np.uint8)
+    visited = np.zeros(distancetable.FACTORIALS[0] * 9, dtype=bool)
+    visited[rankBoards(boards)] = True
+
+    # layers[d] holds (parents, moves) for the boards at depth d + 1
+    layers = []
+    layerSizes = [1]
+    nodes_expanded = 0
+    found = boards[0] == goalBoard
+    goalIndex = 0
+
+    while len(boards) and not found:
+        nodes_expanded += len(boards)
+        children, childBlanks, parents, moves = _expand(boards, blanks)
+
+        ranks = rankBoards(children)
+        fresh = np.nonzero(~visited[ranks])[0]
+        ranks, first = np.unique(ranks[fresh], return_index=True)
+        keep = fresh[first]
+        visited[ranks] = True
+
+        boards, blanks = children[keep], childBlanks[keep]
+        layers.append((parents[keep], moves[keep]))
+        layerSizes.append(len(boards))
+        matches = np.nonzero(boards == goalBoard)[0]
+        if len(matches):
+            found = True
+            goalIndex = matches[0]
+
+    if stats is not None:
+        stats['layer_sizes'] = layerSizes
+    if not found:
+        return [], nodes_expanded, len(layers) - 1
+
+    path = []
+    index = goalIndex
+    for parents, moves in reversed(layers):
+        path.append(MOVES[moves[index]])
+        index = parents[index]
+    path.reverse()
+    return path, nodes_expanded, len(path)